@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""Benchmark ensure_issues.reconcile() against the in-process fake GitHub API.
+
+Writes N synthetic plugins to a temporary directory, seeds the fake repository with
+tracking issues for a share of them (optionally stale, closed, or orphaned), runs one
+reconcile and reports the API calls it made and the wall time it took. ``--targeted N``
+reconciles only N random plugins, the way a single-plugin merge does.
+
+    python3 .github/bench_issues.py --sizes 1000 5000 10000 --latency 20
+    python3 .github/bench_issues.py --sizes 10000 --targeted 1
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import ensure_issues
+from fake_github import FakeGitHub
+
+CATEGORIES = ["monitoring", "utilities", "appearance", "system", "media"]
+COMPOSITORS = ["niri", "hyprland", "sway", "dwl"]
+
+
+def synthetic_plugin(index: int) -> dict:
+    return {
+        "id": f"benchPlugin{index}",
+        "name": f"Bench Plugin {index}",
+        "capabilities": ["dankbar-widget"],
+        "category": CATEGORIES[index % len(CATEGORIES)],
+        "repo": f"https://github.com/bench-author-{index % 97}/bench-plugin-{index}",
+        "author": f"Bench Author {index % 97}",
+        "description": f"Synthetic plugin number {index} used to benchmark issue sync.",
+        "dependencies": [],
+        "compositors": COMPOSITORS[: 1 + index % len(COMPOSITORS)],
+        "distro": ["any"],
+        "screenshot": f"https://github.com/bench-author-{index % 97}/bench-plugin-{index}/blob/main/shot.png",
+    }
+
+
+def write_plugins(plugins_dir: Path, count: int) -> list[dict]:
+    plugins = [synthetic_plugin(i) for i in range(count)]
+    for plugin in plugins:
+        path = plugins_dir / f"bench-{plugin['id']}.json"
+        path.write_text(json.dumps(plugin, indent=4))
+    return plugins
+
+
+def seed_repository(
+    fake: FakeGitHub,
+    plugins: list[dict],
+    existing: float,
+    stale: float,
+    closed: float,
+    orphans: int,
+    rng: random.Random,
+) -> None:
+    fake.seed_label(ensure_issues.PLUGIN_LABEL, ensure_issues.PLUGIN_LABEL_COLOR)
+    labels = [ensure_issues.PLUGIN_LABEL]
+
+    for plugin in plugins:
+        if rng.random() >= existing:
+            continue
+        body = ensure_issues.build_body(plugin)
+        if rng.random() < stale:
+            body = body.replace("**Install:**", "**Install (old):**")
+        state = "closed" if rng.random() < closed else "open"
+        fake.seed_issue(ensure_issues.build_title(plugin), body, labels, state=state)
+
+    for i in range(orphans):
+        gone = synthetic_plugin(len(plugins) + i)
+        fake.seed_issue(ensure_issues.build_title(gone), ensure_issues.build_body(gone), labels)
+
+
+def run(size: int, args: argparse.Namespace) -> dict:
+    rng = random.Random(args.seed)
+    fake = FakeGitHub(latency=args.latency / 1000, rate_limit=10**9, search_rate_limit=10**9)
+    with tempfile.TemporaryDirectory() as tmp, fake:
+        plugins_dir = Path(tmp)
+        plugins = write_plugins(plugins_dir, size)
+        seed_repository(fake, plugins, args.existing, args.stale, args.closed, args.orphans, rng)
+        fake.reset_counters()
+
+        ensure_issues.API_BASE = fake.url
+        ensure_issues.GITHUB_REPOSITORY = fake.repository
+        ensure_issues.GITHUB_TOKEN = ensure_issues.GITHUB_TOKEN or "bench-token"
+        ensure_issues.CREATE_DELAY_SECONDS = 0
+        ensure_issues.ONLY = {plugin["id"] for plugin in rng.sample(plugins, min(args.targeted, size))}
+
+        output = io.StringIO()
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(output):
+            status = ensure_issues.reconcile(plugins_dir)
+        elapsed = time.perf_counter() - start
+
+        return {
+            "size": size,
+            "status": status,
+            "seconds": elapsed,
+            "calls": fake.total_calls,
+            "routes": dict(sorted(fake.calls.items())),
+            "summary": output.getvalue().strip().splitlines()[-1:],
+        }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 5000, 10000], help="plugin counts to benchmark")
+    parser.add_argument("--latency", type=float, default=0.0, help="simulated per-request latency in ms")
+    parser.add_argument("--existing", type=float, default=1.0, help="share of plugins that already have an issue")
+    parser.add_argument("--stale", type=float, default=0.0, help="share of existing issues whose body is outdated")
+    parser.add_argument("--closed", type=float, default=0.0, help="share of existing issues that are closed")
+    parser.add_argument("--orphans", type=int, default=0, help="open issues for plugins no longer in the registry")
+    parser.add_argument("--targeted", type=int, default=0, help="reconcile only this many random plugins")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+
+    results = [run(size, args) for size in args.sizes]
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return 0
+
+    for result in results:
+        rate = result["calls"] / result["seconds"] if result["seconds"] else 0.0
+        print(
+            f"{result['size']:>6} plugins: {result['calls']:>6} API calls in "
+            f"{result['seconds']:.2f}s ({rate:.0f} calls/s)"
+        )
+        for route, count in result["routes"].items():
+            print(f"         {count:>6}  {route}")
+        for line in result["summary"]:
+            print(f"         {line}")
+
+    return 0 if all(result["status"] == 0 for result in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""Benchmark preview panel rendering across generate_theme_previews' renderers.
+
+Renders N panels for a synthetic theme family: every config of the repository's themes
+with the primary color rotated, each scheme rendered under several names the way a
+generated family shares its layers. Renderers:
+
+- reference: the original renderer, which walks PANEL_FALLBACKS with a while loop for
+  every key and formats PANEL_TEMPLATE with str.format on every call
+- compiled: generate_panel, with the fallback chains flattened once and the template
+  precompiled into static pieces, resolving and binding the scheme on every call
+- bound once: bind_panel once per scheme, then render_panel per panel
+
+All renderers must produce identical panels; the script exits non-zero otherwise.
+
+    python3 .github/bench_previews.py --panels 100000 --names 100
+"""
+
+import argparse
+import json
+import sys
+import time
+from html import escape as xml_escape
+from pathlib import Path
+
+import generate_theme_previews as previews
+import theme_model
+
+
+def reference_panel(scheme, name, x):
+    colors = {k: v for k, v in scheme.items() if k in previews.PANEL_KEYS}
+    for key in previews.PANEL_KEYS:
+        if key in colors:
+            continue
+        fallback = previews.PANEL_FALLBACKS.get(key)
+        while fallback and fallback not in colors:
+            fallback = previews.PANEL_FALLBACKS.get(fallback)
+        colors[key] = colors.get(fallback, "#808080")
+    return previews.PANEL_TEMPLATE.format(
+        x=x, name=xml_escape(name), font=previews.FONT_STACK, **colors
+    )
+
+
+def load_schemes(themes_dir: Path) -> list[dict]:
+    schemes = []
+    for theme_file in sorted(themes_dir.glob("*/theme.json")):
+        with open(theme_file) as f:
+            theme = json.load(f)
+        schemes.extend(
+            dict(config.scheme) for config in theme_model.iter_configs(theme) if config.key is not None
+        )
+    return schemes
+
+
+def synthetic_family(schemes: list[dict], panels: int, names: int) -> list[tuple[dict, str]]:
+    # panels / names distinct schemes, cycling through the real ones with the
+    # primary color rotated, each rendered under ``names`` labels.
+    family = []
+    distinct = max(panels // names, 1)
+    for i in range(distinct):
+        scheme = schemes[i % len(schemes)]
+        if i >= len(schemes):
+            scheme = {**scheme, "primary": f"#{(i * 2654435761) & 0xFFFFFF:06x}"}
+        family.extend((scheme, f"Generated theme {i}.{n}") for n in range(names))
+    return family[:panels]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--themes", type=Path, default=Path(__file__).parent.parent / "themes")
+    parser.add_argument("--panels", type=int, default=100_000)
+    parser.add_argument("--names", type=int, default=100, help="panels rendered per distinct scheme")
+    args = parser.parse_args()
+
+    family = synthetic_family(load_schemes(args.themes), args.panels, args.names)
+    print(f"{len(family)} panels, {args.names} per scheme\n")
+
+    results = []
+    start = time.perf_counter()
+    reference = [reference_panel(scheme, name, 0) for scheme, name in family]
+    results.append(("reference", time.perf_counter() - start, reference))
+
+    start = time.perf_counter()
+    compiled = [previews.generate_panel(scheme, name, 0) for scheme, name in family]
+    results.append(("compiled", time.perf_counter() - start, compiled))
+
+    bound = {}
+    start = time.perf_counter()
+    rendered = []
+    for scheme, name in family:
+        key = id(scheme)
+        pieces = bound.get(key)
+        if pieces is None:
+            pieces = bound[key] = previews.bind_panel(previews.resolve_panel_colors(scheme))
+        rendered.append(previews.render_panel(pieces, name, 0))
+    results.append(("bound once", time.perf_counter() - start, rendered))
+
+    baseline = results[0][1]
+    for name, seconds, panels in results:
+        status = "" if panels == reference else "  MISMATCH"
+        print(
+            f"{name:<14} {seconds * 1000:9.1f} ms  {baseline / seconds:5.1f}x"
+            f"  {seconds / len(family) * 1e6:6.2f} us/panel{status}"
+        )
+
+    return 0 if all(panels == reference for _, _, panels in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
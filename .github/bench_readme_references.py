@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""Check that generate_site_content.rewrite_readme_references scales linearly.
+
+Rewrites READMEs of growing size built from one repeated fragment each: an ordinary
+README, and the unclosed constructs that make a backtracking pattern rescan the rest
+of the text from every start (unclosed tags, a single line of backticks, backtick runs
+of every length, unclosed image and link brackets). Every case is timed at --size and
+at four times --size; the script exits non-zero when any case grows by more than
+--max-growth, or takes longer than --budget seconds at the larger size.
+
+    python3 .github/bench_readme_references.py --size 250000
+"""
+
+import argparse
+import sys
+import time
+
+from generate_site_content import rewrite_readme_references
+
+README = """## Usage
+
+![screenshot](docs/screenshot.png) [config](docs/config.md) <img src="assets/icon.svg" width="32">
+Run `dms plugin install` and see [the wiki][wiki] <!-- ![old](old.png) -->
+
+```sh
+![not an image](code.png)
+```
+
+[wiki]: docs/wiki.md
+"""
+
+
+def backtick_runs(size: int) -> str:
+    # Runs of 1, 2, 3... backticks on one line, so no run has a closing match.
+    runs, length, total = [], 1, 0
+    while total < size:
+        runs.append("`" * length)
+        total += length + 1
+        length += 1
+    return " ".join(runs)
+
+
+CASES = {
+    "readme": lambda size: README * (size // len(README)),
+    "unclosed <img": lambda size: "<img " * (size // 5),
+    "unclosed <a": lambda size: "<a " * (size // 3),
+    "backtick line": lambda size: "`" * size,
+    "backtick runs": backtick_runs,
+    "repeated runs": lambda size: backtick_runs(256) * (size // len(backtick_runs(256))),
+    "unclosed ![": lambda size: "![" * (size // 2),
+    "unclosed ](": lambda size: "](" + "a" * size,
+}
+
+
+def time_rewrite(text: str) -> float:
+    start = time.perf_counter()
+    rewrite_readme_references(text, "owner/repo", "main", "plugins/example")
+    return time.perf_counter() - start
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=250_000, help="README size in characters")
+    parser.add_argument("--max-growth", type=float, default=8.0, help="allowed slowdown for 4x the text")
+    parser.add_argument("--budget", type=float, default=2.0, help="seconds allowed at 4x --size")
+    args = parser.parse_args()
+
+    failed = False
+    print(f"{'case':<16} {args.size:>10,} {args.size * 4:>10,}  growth")
+    for name, build in CASES.items():
+        small = time_rewrite(build(args.size))
+        large = time_rewrite(build(args.size * 4))
+        growth = large / max(small, 1e-6)
+        slow = growth > args.max_growth or large > args.budget
+        failed |= slow
+        status = "  TOO SLOW" if slow else ""
+        print(f"{name:<16} {small * 1000:8.1f} ms {large * 1000:7.1f} ms  {growth:5.1f}x{status}")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
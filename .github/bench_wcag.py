@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""Benchmark WCAG scoring of the themes/ directory across check_wcag's engines.
+
+Times a full theme_reports() pass over every theme with:
+
+- reference: the original per-pair path, which parses and linearizes both colors of
+  every pair from scratch
+- memoized: the pure-Python path with the shared linearization table and the per-hex
+  parse/luminance caches, cold (caches cleared) and warm
+
+All engines must produce identical reports; the script exits non-zero otherwise.
+
+    python3 .github/bench_wcag.py --repeat 20
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import check_wcag
+import theme_model
+
+
+def reference_scheme_ratios(scheme, pairs=check_wcag.ALL_PAIRS):
+    def parse(value):
+        if not isinstance(value, str) or len(value) != 7 or not value.startswith("#"):
+            return None
+        try:
+            return tuple(int(value[i : i + 2], 16) for i in (1, 3, 5))
+        except ValueError:
+            return None
+
+    def luminance(rgb):
+        r, g, b = (check_wcag.linearize(c) for c in rgb)
+        return 0.2126 * r + 0.7152 * g + 0.0722 * b
+
+    ratios = {}
+    for fg_key, bg_key in pairs:
+        fg = parse(scheme.get(fg_key))
+        bg = parse(scheme.get(bg_key))
+        if fg is None or bg is None:
+            continue
+        lighter, darker = sorted((luminance(fg), luminance(bg)), reverse=True)
+        ratios[(fg_key, bg_key)] = (lighter + 0.05) / (darker + 0.05)
+    return ratios
+
+
+def clear_caches():
+    check_wcag._PARSED_HEX.clear()
+    check_wcag._HEX_LUMINANCE.clear()
+
+
+def load_themes(themes_dir: Path) -> dict:
+    themes = {}
+    for theme_dir in sorted(themes_dir.iterdir()):
+        if (theme_dir / "theme.json").exists():
+            theme = check_wcag.load_theme(theme_dir)
+            if theme is not None:
+                themes[theme_dir.name] = theme
+    return themes
+
+
+def time_pass(themes: dict, repeat: int, before=None) -> tuple[float, dict]:
+    best = float("inf")
+    reports = None
+    for _ in range(repeat):
+        if before:
+            before()
+        start = time.perf_counter()
+        reports = check_wcag.theme_reports(themes)
+        best = min(best, time.perf_counter() - start)
+    return best, reports
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--themes", type=Path, default=Path(__file__).parent.parent / "themes")
+    parser.add_argument("--repeat", type=int, default=20, help="passes per engine; the best is reported")
+    args = parser.parse_args()
+
+    themes = load_themes(args.themes)
+    configs = sum(
+        len(theme_model.mode_configs(theme, mode)) for theme in themes.values() for mode in ("dark", "light")
+    )
+    print(f"{len(themes)} themes, {configs} configs, best of {args.repeat}\n")
+
+    scheme_ratios = check_wcag.scheme_ratios
+    results = []
+    try:
+        check_wcag.scheme_ratios = reference_scheme_ratios
+        results.append(("reference", *time_pass(themes, args.repeat)))
+        check_wcag.scheme_ratios = scheme_ratios
+        results.append(("memoized (cold)", *time_pass(themes, args.repeat, clear_caches)))
+        results.append(("memoized (warm)", *time_pass(themes, args.repeat)))
+    finally:
+        check_wcag.scheme_ratios = scheme_ratios
+
+    baseline_seconds, baseline_reports = results[0][1], results[0][2]
+    for name, seconds, reports in results:
+        status = "" if reports == baseline_reports else "  MISMATCH"
+        print(
+            f"{name:<16} {seconds * 1000:8.2f} ms  {baseline_seconds / seconds:6.1f}x"
+            f"  {seconds / configs * 1e6:7.1f} us/config{status}"
+        )
+
+    return 0 if all(reports == baseline_reports for _, _, reports in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""Build the plugin site's client-side search index.
+
+Runs after generate_site_content.py: plugin names, descriptions and tags come from
+plugins/*.json, README text from the generated site/content pages. The index is an
+inverted index of normalized terms split into small JSON shards by term prefix, so
+the browser (site/dms/static/search.js) loads index.json once and then only the
+shards the typed words start with:
+
+- index.json: {"version", "prefixLength", "docs": [[slug, title, description], ...],
+  "shards": {prefix: filename}}, the prefix table
+- <shard>.json: {"terms": [...sorted...], "postings": [[doc, score, doc, score, ...], ...]}
+
+A term's score in a document is the sum of the weights of the fields it occurs in.
+"""
+
+import argparse
+import json
+import re
+import sys
+import unicodedata
+from pathlib import Path
+
+INDEX_VERSION = 1
+INDEX_NAME = "index.json"
+# Served next to search.js, from the theme's static directory
+SEARCH_INDEX_DIR = Path(__file__).parent.parent / "site" / "dms" / "static" / "search"
+PREFIX_LENGTH = 2
+MIN_TERM_LENGTH = 2
+
+# Where a term occurs matters more than how often: a name match outranks a tag,
+# which outranks the description, which outranks a passing README mention.
+FIELD_WEIGHTS = {"name": 8, "tags": 4, "description": 2, "readme": 1}
+TAG_FIELDS = ("capabilities", "category", "compositors", "distro")
+
+TERM_RE = re.compile(r"\w+")
+URL_RE = re.compile(r"\b(?:https?|ftp)://\S+")
+HTML_TAG_RE = re.compile(r"<[^>\n]*>")
+FRONTMATTER_RE = re.compile(r"\A---\n(.*?)\n---\n", re.DOTALL)
+# The generated page is frontmatter, description, badges and the plugin
+# information table; the README starts after the table's last row.
+README_START_RE = re.compile(r"^\| requires DMS .*$", re.MULTILINE)
+SLUG_RE = re.compile(r"[^a-z0-9]+")
+
+
+def normalize(text: str) -> str:
+    # Case- and accent-insensitive, the same folding search.js applies to queries
+    decomposed = unicodedata.normalize("NFKD", text.lower())
+    return "".join(c for c in decomposed if not unicodedata.combining(c))
+
+
+def tokenize(text: str) -> set[str]:
+    return {term for term in TERM_RE.findall(normalize(text)) if len(term) >= MIN_TERM_LENGTH}
+
+
+def slugify(text: str) -> str:
+    ascii_text = normalize(text).encode("ascii", "ignore").decode()
+    return SLUG_RE.sub("-", ascii_text).strip("-")
+
+
+def read_page(page_path: Path) -> tuple[dict, str]:
+    """Frontmatter fields and README text of a generated page."""
+    try:
+        text = page_path.read_text()
+    except OSError:
+        return {}, ""
+
+    frontmatter = {}
+    match = FRONTMATTER_RE.match(text)
+    if match:
+        for line in match.group(1).splitlines():
+            key, _, value = line.partition(":")
+            frontmatter[key.strip()] = value.strip()
+        text = text[match.end() :]
+
+    readme_start = README_START_RE.search(text)
+    if readme_start:
+        text = text[readme_start.end() :]
+    return frontmatter, HTML_TAG_RE.sub(" ", URL_RE.sub(" ", text))
+
+
+def plugin_fields(plugin: dict, readme: str) -> dict[str, str]:
+    tags = []
+    for field in TAG_FIELDS:
+        value = plugin.get(field, [])
+        tags.extend(value if isinstance(value, list) else [value])
+    return {
+        "name": " ".join(str(plugin.get(key, "")) for key in ("name", "id")),
+        "tags": " ".join(str(tag) for tag in tags),
+        "description": str(plugin.get("description", "")),
+        "readme": readme,
+    }
+
+
+def shard_filename(prefix: str) -> str:
+    # Terms are Unicode; shard filenames stay ASCII and URL-safe.
+    if prefix.isascii() and prefix.isalnum():
+        return f"{prefix}.json"
+    return f"u{prefix.encode().hex()}.json"
+
+
+def build_search_index(plugins_dir: Path, content_dir: Path) -> dict[str, dict]:
+    """Index of every plugin, as {filename: JSON document}."""
+    docs = []
+    postings: dict[str, list[int]] = {}
+
+    for json_file in sorted(plugins_dir.glob("*.json")):
+        try:
+            with open(json_file) as f:
+                plugin = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"Warning: Skipping {json_file.name}: {e}", file=sys.stderr)
+            continue
+
+        frontmatter, readme = read_page(content_dir / f"{json_file.stem}.md")
+        title = plugin.get("name", "Unknown Plugin")
+        # marmite's slug: the frontmatter slug, else the slugified title
+        slug = slugify(frontmatter.get("slug") or frontmatter.get("title") or title)
+        doc = len(docs)
+        docs.append([slug, title, plugin.get("description", "")])
+
+        scores: dict[str, int] = {}
+        for field, text in plugin_fields(plugin, readme).items():
+            for term in tokenize(text):
+                scores[term] = scores.get(term, 0) + FIELD_WEIGHTS[field]
+        for term, score in scores.items():
+            postings.setdefault(term, []).extend((doc, score))
+
+    shards: dict[str, dict] = {}
+    for term in sorted(postings):
+        shard = shards.setdefault(term[:PREFIX_LENGTH], {"terms": [], "postings": []})
+        shard["terms"].append(term)
+        shard["postings"].append(postings[term])
+
+    files = {shard_filename(prefix): shard for prefix, shard in shards.items()}
+    files[INDEX_NAME] = {
+        "version": INDEX_VERSION,
+        "prefixLength": PREFIX_LENGTH,
+        "docs": docs,
+        "shards": {prefix: shard_filename(prefix) for prefix in shards},
+    }
+    return files
+
+
+def write_search_index(plugins_dir: Path, content_dir: Path, out_dir: Path) -> int:
+    """Write the index to ``out_dir``, touching only shards that changed.
+
+    Returns:
+        Number of files written or removed
+    """
+    files = build_search_index(plugins_dir, content_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    changed = 0
+    largest_shard = 0
+    for filename, document in files.items():
+        data = json.dumps(document, ensure_ascii=False, separators=(",", ":")).encode()
+        if filename != INDEX_NAME:
+            largest_shard = max(largest_shard, len(data))
+        path = out_dir / filename
+        if path.exists() and path.read_bytes() == data:
+            continue
+        path.write_bytes(data)
+        changed += 1
+
+    for stale in out_dir.glob("*.json"):
+        if stale.name not in files:
+            stale.unlink()
+            changed += 1
+
+    print(
+        f"Search index: {len(files[INDEX_NAME]['docs'])} plugins, {len(files) - 1} shards "
+        f"(largest {largest_shard / 1024:.1f} KiB), {changed} file(s) updated"
+    )
+    return changed
+
+
+def main() -> int:
+    repo_root = Path(__file__).parent.parent
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--plugins", type=Path, default=repo_root / "plugins")
+    parser.add_argument("--content", type=Path, default=repo_root / "site" / "content")
+    parser.add_argument("--out", type=Path, default=SEARCH_INDEX_DIR)
+    args = parser.parse_args()
+
+    write_search_index(args.plugins, args.content, args.out)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,10 +2,15 @@
 """Check theme color schemes against WCAG 2.2 contrast requirements."""
 
 import argparse
+import hashlib
 import json
+import os
 import sys
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
+import theme_model
+
 GREEN = "\033[92m"
 RED = "\033[91m"
 YELLOW = "\033[93m"
@@ -50,41 +55,90 @@ NON_TEXT_PAIRS = [
 ]
 NON_TEXT_RATIO = 3.0
 
+# Every pair any report looks at, in first-seen order. Ratios are computed once per
+# scheme for this list and shared by all the worst-pair lookups.
+ALL_PAIRS = list(dict.fromkeys(TEXT_PAIRS + NON_TEXT_PAIRS))
+
 LEVEL_RANK = {"fail": 0, "AA": 1, "AAA": 2}
 
+# The contrast matrix export stores ratios as integers in hundredths, the
+# precision every report rounds to; 0 marks a pair with a missing color.
+MATRIX_SCALE = 100
+
+# Folded into every wcag.json sourceHash so that changing which pairs are scored
+# or where the thresholds sit invalidates all cached reports.
+RULES_FINGERPRINT = json.dumps(
+    [BODY_PAIRS, ACCENT_PAIRS, NON_TEXT_PAIRS, AA_RATIO, AAA_RATIO, NON_TEXT_RATIO, theme_model.FALLBACKS]
+).encode()
+
+
+def linearize(channel):
+    channel = channel / 255
+    if channel <= 0.03928:
+        return channel / 12.92
+    return ((channel + 0.055) / 1.055) ** 2.4
+
+
+# A channel only takes 256 values, so linearization is tabulated once. Themes
+# also repeat the same few dozen hex strings across every variant config, so
+# parsed colors and luminances are interned per string: scoring a config is
+# then a couple of dictionary lookups per pair.
+LINEAR_TABLE = tuple(linearize(c) for c in range(256))
+_PARSED_HEX = {}
+_HEX_LUMINANCE = {}
+
 
 def parse_hex(value):
     if not isinstance(value, str):
         return None
-    if len(value) != 7 or not value.startswith("#"):
-        return None
 
     try:
-        return tuple(int(value[i : i + 2], 16) for i in (1, 3, 5))
-    except ValueError:
-        return None
+        return _PARSED_HEX[value]
+    except KeyError:
+        pass
+
+    rgb = None
+    if len(value) == 7 and value.startswith("#"):
+        try:
+            rgb = tuple(int(value[i : i + 2], 16) for i in (1, 3, 5))
+        except ValueError:
+            pass
+    _PARSED_HEX[value] = rgb
+    return rgb
 
 
 def relative_luminance(rgb):
     # https://www.w3.org/TR/WCAG22/#dfn-relative-luminance
-    def linearize(channel):
-        channel = channel / 255
-        if channel <= 0.03928:
-            return channel / 12.92
-        return ((channel + 0.055) / 1.055) ** 2.4
-
-    r, g, b = (linearize(c) for c in rgb)
+    # int() also accepts signed pairs like "-1", which fall outside the table.
+    r, g, b = (LINEAR_TABLE[c] if 0 <= c <= 255 else linearize(c) for c in rgb)
     return 0.2126 * r + 0.7152 * g + 0.0722 * b
 
 
-def contrast_ratio(fg, bg):
+def hex_luminance(value):
+    if not isinstance(value, str):
+        return None
+
+    try:
+        return _HEX_LUMINANCE[value]
+    except KeyError:
+        pass
+
+    rgb = parse_hex(value)
+    luminance = None if rgb is None else relative_luminance(rgb)
+    _HEX_LUMINANCE[value] = luminance
+    return luminance
+
+
+def luminance_ratio(first, second):
     # https://www.w3.org/TR/WCAG22/#dfn-contrast-ratio
-    lighter, darker = sorted(
-        (relative_luminance(fg), relative_luminance(bg)), reverse=True
-    )
+    lighter, darker = (first, second) if first >= second else (second, first)
     return (lighter + 0.05) / (darker + 0.05)
 
 
+def contrast_ratio(fg, bg):
+    return luminance_ratio(relative_luminance(fg), relative_luminance(bg))
+
+
 def level_for_ratio(ratio):
     if ratio >= AAA_RATIO:
         return "AAA"
@@ -93,15 +147,28 @@ def level_for_ratio(ratio):
     return "fail"
 
 
-def worst_ratio(scheme, pairs):
-    worst = None
+def scheme_ratios(scheme, pairs=ALL_PAIRS):
+    # Schemes come in as ThemeConfig.colors, with DMS's fallbacks already
+    # applied; a pair still missing a color, or with a malformed one, is left out.
+    ratios = {}
     for fg_key, bg_key in pairs:
-        fg = parse_hex(scheme.get(fg_key))
-        bg = parse_hex(scheme.get(bg_key))
+        fg = hex_luminance(scheme.get(fg_key))
+        bg = hex_luminance(scheme.get(bg_key))
         if fg is None or bg is None:
             continue
+        ratios[(fg_key, bg_key)] = luminance_ratio(fg, bg)
+    return ratios
 
-        ratio = contrast_ratio(fg, bg)
+
+def worst_ratio(scheme, pairs, ratios=None):
+    if ratios is None:
+        ratios = scheme_ratios(scheme, pairs)
+
+    worst = None
+    for fg_key, bg_key in pairs:
+        ratio = ratios.get((fg_key, bg_key))
+        if ratio is None:
+            continue
         if worst is not None and ratio >= worst[0]:
             continue
         worst = (ratio, fg_key, bg_key)
@@ -109,8 +176,8 @@ def worst_ratio(scheme, pairs):
     return worst
 
 
-def group_report(scheme, pairs):
-    worst = worst_ratio(scheme, pairs)
+def group_report(scheme, pairs, ratios=None):
+    worst = worst_ratio(scheme, pairs, ratios)
     if worst is None:
         return None
 
@@ -122,8 +189,11 @@ def group_report(scheme, pairs):
     }
 
 
-def scheme_report(scheme):
-    text = worst_ratio(scheme, TEXT_PAIRS)
+def scheme_report(scheme, ratios=None):
+    if ratios is None:
+        ratios = scheme_ratios(scheme)
+
+    text = worst_ratio(scheme, TEXT_PAIRS, ratios)
     if text is None:
         return None
 
@@ -134,15 +204,15 @@ def scheme_report(scheme):
         "worstPair": [fg_key, bg_key],
     }
 
-    body = group_report(scheme, BODY_PAIRS)
+    body = group_report(scheme, BODY_PAIRS, ratios)
     if body:
         report["body"] = body
 
-    accent = group_report(scheme, ACCENT_PAIRS)
+    accent = group_report(scheme, ACCENT_PAIRS, ratios)
     if accent:
         report["accent"] = accent
 
-    non_text = worst_ratio(scheme, NON_TEXT_PAIRS)
+    non_text = worst_ratio(scheme, NON_TEXT_PAIRS, ratios)
     if non_text is None:
         return report
 
@@ -159,69 +229,15 @@ def scheme_report(scheme):
     return report
 
 
-def mode_configs(theme, mode):
-    # A config is one thing a user can actually select. Themes without variants
-    # offer just the mode itself; flavor themes offer every flavor/accent combo.
-    # Each config carries the group it rolls up to for the breakdown display.
-    base = theme.get(mode, {})
-    variants = theme.get("variants")
-    plain = [{"key": "", "group": "", "label": mode.capitalize(), "scheme": base}]
-    if not variants:
-        return plain, ""
-
-    if variants.get("type") == "multi":
-        return multi_variant_configs(variants, base, mode)
-
-    options = variants.get("options", [])
-    if not options:
-        return plain, ""
-
-    configs = []
-    for option in options:
-        oid = option.get("id")
-        if not oid:
-            continue
-        configs.append(
-            {
-                "key": oid,
-                "group": oid,
-                "label": option.get("name") or oid,
-                "scheme": {**base, **option.get(mode, {})},
-            }
-        )
-    return configs, variants.get("default", "")
-
-
-def multi_variant_configs(variants, base, mode):
+def config_label(config):
     # Accents roll up into their flavor: authors document flavors as the unit a
     # user picks, and listing every combo would run to dozens of rows.
-    configs = []
-    for flavor in variants.get("flavors", []):
-        fid = flavor.get("id")
-        if not fid or mode not in flavor:
-            continue
-
-        flavor_label = flavor.get("name") or fid
-        for accent in variants.get("accents", []):
-            aid = accent.get("id")
-            if not aid:
-                continue
-            configs.append(
-                {
-                    "key": f"{fid}-{aid}",
-                    "group": fid,
-                    "label": flavor_label,
-                    "scheme": {
-                        **base,
-                        **flavor.get(mode, {}),
-                        **(accent.get(fid) or {}),
-                    },
-                }
-            )
-
-    defaults = variants.get("defaults", {}).get(mode, {})
-    default_key = f"{defaults.get('flavor')}-{defaults.get('accent')}"
-    return configs, default_key
+    if config.flavor is not None:
+        flavor = config.flavor[1]
+        return flavor.get("name") or flavor.get("id")
+    if config.option is not None:
+        return config.option[1].get("name") or config.key
+    return config.mode.capitalize()
 
 
 def worst_report(reports):
@@ -232,17 +248,19 @@ def worst_report(reports):
 
 
 def mode_report(theme, mode):
-    configs, default_key = mode_configs(theme, mode)
+    configs = theme_model.mode_configs(theme, mode)
+    default_key = theme_model.default_key(theme, mode)
+
     reports = {}
     groups = {}
     for config in configs:
-        report = scheme_report(config["scheme"])
+        report = scheme_report(config.colors)
         if report is None:
             continue
 
-        reports[config["key"]] = report
+        reports[config.key] = report
         group = groups.setdefault(
-            config["group"], {"name": config["label"], "levels": [], "bodyLevels": []}
+            config.group, {"name": config_label(config), "levels": [], "bodyLevels": []}
         )
         group["levels"].append(report["level"])
         group["bodyLevels"].append(report.get("body", {}).get("level", "fail"))
@@ -282,6 +300,84 @@ def theme_report(theme):
     return report
 
 
+def theme_reports(themes, jobs=1):
+    # theme_report over {name: theme}. With jobs > 1 the themes are split into
+    # contiguous chunks scored in worker processes, then merged back in the
+    # order they came in.
+    if jobs > 1 and len(themes) > 1:
+        names = list(themes)
+        size = -(-len(names) // jobs)
+        chunks = [
+            {name: themes[name] for name in names[i : i + size]}
+            for i in range(0, len(names), size)
+        ]
+        with ProcessPoolExecutor(max_workers=len(chunks)) as pool:
+            reports = {}
+            for chunk_reports in pool.map(theme_reports, chunks):
+                reports.update(chunk_reports)
+        return {name: reports[name] for name in names}
+
+    return {name: theme_report(theme) for name, theme in themes.items()}
+
+
+def matrix_keys(schemes):
+    # Every key that holds a usable color in at least one scheme, so all configs
+    # of a mode share one key order and one matrix layout.
+    return sorted(
+        {key for scheme in schemes for key, value in scheme.items() if hex_luminance(value) is not None}
+    )
+
+
+def contrast_matrix(scheme, keys):
+    # Upper triangle of the symmetric key-by-key matrix, row-major: (0, 1),
+    # (0, 2), ..., (1, 2), ... The diagonal is always 1:1 and left out. The 0.05
+    # flare term of luminance_ratio is added once per key rather than per pair.
+    shifted = []
+    for key in keys:
+        luminance = hex_luminance(scheme.get(key))
+        shifted.append(None if luminance is None else luminance + 0.05)
+
+    matrix = []
+    for i, first in enumerate(shifted):
+        for second in shifted[i + 1 :]:
+            if first is None or second is None:
+                matrix.append(0)
+            elif first >= second:
+                matrix.append(round(first / second * MATRIX_SCALE))
+            else:
+                matrix.append(round(second / first * MATRIX_SCALE))
+    return matrix
+
+
+def theme_matrices(themes):
+    # {name: theme} -> {name: {mode: {"keys": [...], "configs": {key: matrix}}}}
+    matrices = {}
+    for name, theme in themes.items():
+        modes = {}
+        for mode in ("dark", "light"):
+            configs = theme_model.mode_configs(theme, mode)
+            schemes = [config.colors for config in configs]
+            keys = matrix_keys(schemes)
+            if len(keys) < 2:
+                continue
+            rows = [contrast_matrix(scheme, keys) for scheme in schemes]
+            modes[mode] = {
+                "keys": keys,
+                "configs": {config.key: row for config, row in zip(configs, rows)},
+            }
+        if modes:
+            matrices[name] = modes
+    return matrices
+
+
+def write_matrices(matrix_file, themes):
+    document = {"scale": MATRIX_SCALE, "themes": theme_matrices(themes)}
+    with open(matrix_file, "w") as f:
+        json.dump(document, f, sort_keys=True, separators=(",", ":"))
+        f.write("\n")
+    print(f"Wrote {matrix_file} ({len(document['themes'])} themes)")
+
+
 def breakdown_rows(report):
     rows = []
     for mode in ("dark", "light"):
@@ -385,6 +481,75 @@ def load_theme(theme_dir):
         return None
 
 
+def source_hash(theme_bytes):
+    digest = hashlib.sha256(RULES_FINGERPRINT)
+    digest.update(theme_bytes)
+    return digest.hexdigest()
+
+
+def theme_source_hash(theme_dir):
+    try:
+        return source_hash((theme_dir / "theme.json").read_bytes())
+    except OSError:
+        return None
+
+
+def load_cached_report(theme_dir, expected_hash):
+    # The wcag.json next to a theme is only trusted if it was written for the
+    # exact theme.json (and scoring rules) that is there now.
+    if expected_hash is None:
+        return None
+    try:
+        with open(theme_dir / "wcag.json") as f:
+            report = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+
+    if not isinstance(report, dict) or report.pop("sourceHash", None) != expected_hash:
+        return None
+    return report
+
+
+def write_report(theme_dir, report, digest):
+    # Returns whether wcag.json changed; a rescored theme whose report came out
+    # the same is left untouched.
+    path = theme_dir / "wcag.json"
+    text = json.dumps({**report, "sourceHash": digest}, indent=2) + "\n"
+    try:
+        if path.read_text() == text:
+            return False
+    except OSError:
+        pass
+    path.write_text(text)
+    return True
+
+
+def write_reports(theme_dirs, force=False, jobs=1):
+    # Only themes whose theme.json changed since their wcag.json was written
+    # get scored, so the cost tracks the number of edited themes.
+    stale = {}
+    digests = {}
+    fresh = 0
+    for theme_dir in theme_dirs:
+        digest = theme_source_hash(theme_dir)
+        if not force and load_cached_report(theme_dir, digest) is not None:
+            fresh += 1
+            continue
+        theme = load_theme(theme_dir)
+        if theme is None:
+            continue
+        stale[theme_dir] = theme
+        digests[theme_dir] = digest
+
+    for theme_dir, report in theme_reports(stale, jobs).items():
+        if report is None:
+            continue
+        if write_report(theme_dir, report, digests[theme_dir]):
+            print(f"Wrote {theme_dir / 'wcag.json'}")
+
+    print(f"{fresh} wcag.json file(s) already up to date")
+
+
 def main():
     parser = argparse.ArgumentParser(description=__doc__)
     parser.add_argument("dirs", nargs="*", help="theme directories (default: all)")
@@ -392,9 +557,27 @@ def main():
     output.add_argument("--json", action="store_true")
     output.add_argument("--markdown", action="store_true")
     output.add_argument(
-        "--write", action="store_true", help="write wcag.json next to each theme.json"
+        "--write",
+        action="store_true",
+        help="write wcag.json next to each theme.json whose source changed",
+    )
+    output.add_argument(
+        "--matrix",
+        type=Path,
+        metavar="FILE",
+        help="write the full key-by-key contrast matrix of every config to FILE",
+    )
+    parser.add_argument(
+        "--force", action="store_true", help="with --write, rescore every theme instead of trusting its wcag.json"
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="score themes in this many processes (0 = one per CPU)",
     )
     args = parser.parse_args()
+    jobs = args.jobs or os.cpu_count()
 
     if args.dirs:
         theme_dirs = [Path(d) for d in args.dirs]
@@ -407,23 +590,25 @@ def main():
             d for d in themes_root.iterdir() if (d / "theme.json").exists()
         )
 
-    reports = {}
+    if args.write:
+        write_reports(theme_dirs, args.force, jobs)
+        return
+
+    themes = {}
     for theme_dir in theme_dirs:
         theme = load_theme(theme_dir)
-        if theme is None:
-            continue
-        report = theme_report(theme)
-        if report is None:
-            continue
-        reports[theme_dir.name] = report
-        if args.write:
-            with open(theme_dir / "wcag.json", "w") as f:
-                json.dump(report, f, indent=2)
-                f.write("\n")
-            print(f"Wrote {theme_dir / 'wcag.json'}")
+        if theme is not None:
+            themes[theme_dir] = theme
 
-    if args.write:
+    if args.matrix:
+        write_matrices(args.matrix, {theme_dir.name: theme for theme_dir, theme in themes.items()})
         return
+
+    reports = {}
+    for theme_dir, report in theme_reports(themes, jobs).items():
+        if report is not None:
+            reports[theme_dir.name] = report
+
     if args.json:
         print(json.dumps(reports, indent=2))
         return
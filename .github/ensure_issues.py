@@ -5,11 +5,15 @@ Each plugin gets one tracking issue used as its forum and upvote surface. This s
 creates issues for new plugins, reopens issues for plugins that returned, and closes
 issues for plugins removed from the registry. Issues are matched back to a plugin via a
 hidden ``<!-- dms-plugin-id: <id> -->`` marker in the body.
+
+``--only id[,id...]`` or ``--changed-since <rev>`` narrows a run to specific plugins: only
+their issues are looked up (through the search API) and every other plugin is skipped.
 """
 
 import json
 import os
 import re
+import subprocess
 import sys
 import time
 from pathlib import Path
@@ -30,18 +34,27 @@ SIMILAR_END = "<!-- dms-similar-end -->"
 SIMILAR_BLOCK_RE = re.compile(r"<!-- dms-similar-start -->.*?<!-- dms-similar-end -->", re.DOTALL)
 SIMILAR_DATA_RE = re.compile(r"<!--\s*dms-similar:\s*([^>]*?)\s*-->")
 CREATE_DELAY_SECONDS = 3.0
+# GitHub search allows at most five OR operators per query.
+SEARCH_BATCH_SIZE = 6
+# The search API allows 30 requests a minute, and listing every plugin issue takes
+# only a few pages, so past this many plugins the whole list is fetched instead.
+SEARCH_MAX_PLUGINS = 36
 
 DRY_RUN = "--dry-run" in sys.argv
 
 
-def only_filter() -> str:
-    for i, arg in enumerate(sys.argv):
-        if arg == "--only" and i + 1 < len(sys.argv):
-            return sys.argv[i + 1]
-    return ""
+def arg_values(flag: str) -> list[str]:
+    return [sys.argv[i + 1] for i, arg in enumerate(sys.argv[:-1]) if arg == flag]
+
+
+def only_filter() -> set[str]:
+    return {
+        part.strip() for value in arg_values("--only") for part in value.split(",") if part.strip()
+    }
 
 
 ONLY = only_filter()
+CHANGED_SINCE = next(iter(arg_values("--changed-since")), "")
 
 
 def headers() -> dict:
@@ -197,6 +210,106 @@ def fetch_plugin_issues() -> dict[str, dict]:
     return issues
 
 
+def search_plugin_issues(plugin_ids: set[str]) -> dict[str, dict]:
+    """Look up the tracking issues of specific plugins without listing the whole repo.
+
+    Ids are OR-ed together in batches through the search API. Search indexing lags issue
+    creation, so the newest page of plugin issues is listed as well; that keeps a plugin
+    touched by two merges in quick succession from getting a duplicate issue.
+    """
+    issues = {}
+    ordered = sorted(plugin_ids)
+    for start in range(0, len(ordered), SEARCH_BATCH_SIZE):
+        terms = " OR ".join(
+            f'"dms-plugin-id: {plugin_id}"' for plugin_id in ordered[start : start + SEARCH_BATCH_SIZE]
+        )
+        query = f"repo:{GITHUB_REPOSITORY} is:issue label:{PLUGIN_LABEL} {terms}"
+        page = 1
+        while True:
+            response = api(
+                "GET",
+                "/search/issues",
+                params={"q": query, "sort": "created", "order": "asc", "per_page": 100, "page": page},
+            )
+            batch = response.json().get("items", [])
+            for issue in batch:
+                match = MARKER_RE.search(issue.get("body") or "")
+                if match and match.group(1) in plugin_ids:
+                    issues.setdefault(match.group(1), issue)
+            if len(batch) < 100:
+                break
+            page += 1
+
+    response = api(
+        "GET",
+        f"/repos/{GITHUB_REPOSITORY}/issues",
+        params={"labels": PLUGIN_LABEL, "state": "all", "per_page": 100},
+    )
+    for issue in reversed(response.json()):
+        if "pull_request" in issue:
+            continue
+        match = MARKER_RE.search(issue.get("body") or "")
+        if match and match.group(1) in plugin_ids:
+            issues.setdefault(match.group(1), issue)
+
+    return issues
+
+
+def changed_plugin_ids(base: str, plugins_dir: Path) -> set[str]:
+    """Return the ids of plugins added, edited or removed since ``base``.
+
+    Both sides of every changed file count, so renaming an id closes the old issue and
+    opens the new one. Removed and pre-edit contents come from a single
+    ``git cat-file --batch`` call rather than one process per file.
+    """
+    repo_root = plugins_dir.parent
+    diff = subprocess.run(
+        ["git", "diff", "--name-only", "--no-renames", base, "--", f"{plugins_dir.name}/"],
+        cwd=repo_root,
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    paths = [path for path in diff.stdout.splitlines() if path.endswith(".json")]
+    if not paths:
+        return set()
+
+    contents = []
+    for path in paths:
+        head_file = repo_root / path
+        if head_file.exists():
+            contents.append(head_file.read_bytes())
+
+    batch = subprocess.run(
+        ["git", "cat-file", "--batch"],
+        cwd=repo_root,
+        input="".join(f"{base}:{path}\n" for path in paths).encode(),
+        check=True,
+        capture_output=True,
+    )
+    out = batch.stdout
+    pos = 0
+    while pos < len(out):
+        end = out.index(b"\n", pos)
+        header = out[pos:end].split()
+        pos = end + 1
+        if len(header) != 3:
+            continue
+        size = int(header[2])
+        contents.append(out[pos : pos + size])
+        pos += size + 1
+
+    ids = set()
+    for content in contents:
+        try:
+            plugin_id = json.loads(content).get("id")
+        except (json.JSONDecodeError, AttributeError):
+            continue
+        if plugin_id:
+            ids.add(plugin_id)
+    return ids
+
+
 def create_issue(plugin: dict) -> None:
     if DRY_RUN:
         print(f"[dry-run] would create issue for '{plugin['id']}': {build_title(plugin)}")
@@ -305,23 +418,42 @@ def set_issue_state(issue: dict, state: str, comment: str = "") -> None:
     api("PATCH", f"/repos/{GITHUB_REPOSITORY}/issues/{number}", json=payload)
 
 
-def reconcile() -> int:
+def reconcile(plugins_dir: Path | None = None) -> int:
     if not GITHUB_TOKEN and not DRY_RUN:
         print("GITHUB_TOKEN is required", file=sys.stderr)
         return 1
 
-    plugins_dir = Path(__file__).parent.parent / "plugins"
+    plugins_dir = plugins_dir or Path(__file__).parent.parent / "plugins"
     plugins = load_plugins(plugins_dir)
     names = {plugin_id: plugin.get("name", plugin_id) for plugin_id, plugin in plugins.items()}
 
+    targets = None
     if ONLY:
-        plugins = {ONLY: plugins[ONLY]} if ONLY in plugins else {}
-        if not plugins:
-            print(f"Plugin '{ONLY}' not found", file=sys.stderr)
+        missing = sorted(ONLY - plugins.keys())
+        if missing:
+            print(f"Plugin(s) not found: {', '.join(missing)}", file=sys.stderr)
             return 1
+        targets = set(ONLY)
+    elif CHANGED_SINCE:
+        try:
+            targets = changed_plugin_ids(CHANGED_SINCE, plugins_dir)
+        except subprocess.CalledProcessError as e:
+            print(f"Could not diff against {CHANGED_SINCE}, reconciling everything: {e}", file=sys.stderr)
+        else:
+            if not targets:
+                print("No plugin changes since the given revision; nothing to reconcile")
+                return 0
 
     ensure_plugin_label()
-    issues = fetch_plugin_issues()
+    if targets is None:
+        issues = fetch_plugin_issues()
+    else:
+        plugins = {plugin_id: plugins[plugin_id] for plugin_id in sorted(targets) if plugin_id in plugins}
+        if len(targets) > SEARCH_MAX_PLUGINS:
+            issues = fetch_plugin_issues()
+            issues = {plugin_id: issue for plugin_id, issue in issues.items() if plugin_id in targets}
+        else:
+            issues = search_plugin_issues(targets)
 
     created = reopened = closed = updated = 0
 
@@ -337,14 +469,13 @@ def reconcile() -> int:
         if sync_issue_content(issue, plugin, names):
             updated += 1
 
-    if not ONLY:
-        for plugin_id, issue in issues.items():
-            if plugin_id in plugins:
-                continue
-            if issue["state"] == "closed":
-                continue
-            set_issue_state(issue, "closed", "Plugin was removed from the registry; closing.")
-            closed += 1
+    for plugin_id, issue in issues.items():
+        if plugin_id in plugins:
+            continue
+        if issue["state"] == "closed":
+            continue
+        set_issue_state(issue, "closed", "Plugin was removed from the registry; closing.")
+        closed += 1
 
     print(f"Reconciled: {created} created, {reopened} reopened, {updated} updated, {closed} closed")
     return 0
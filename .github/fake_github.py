@@ -0,0 +1,457 @@
+#!/usr/bin/env python3
+"""In-process stand-in for the slice of the GitHub REST API that ensure_issues.py uses.
+
+Serves labels, issues (list/create/patch/search), comments, reactions and the
+``PluginIssues`` GraphQL query of harvest_ranking.py for a single repository from
+memory, with GitHub-style ``Link`` pagination, ``X-RateLimit-*`` headers and an
+optional per-request latency. Every request is counted by route so benchmarks can report
+how many API calls a reconcile actually made without touching a real repository.
+"""
+
+import json
+import re
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlencode, urlparse
+
+DEFAULT_REPOSITORY = "AvengeMedia/dms-plugin-registry"
+DEFAULT_RATE_LIMIT = 5000
+RATE_LIMIT_WINDOW_SECONDS = 3600
+# https://docs.github.com/en/rest/search/search#rate-limit
+DEFAULT_SEARCH_RATE_LIMIT = 30
+SEARCH_RATE_LIMIT_WINDOW_SECONDS = 60
+MAX_PER_PAGE = 100
+GRAPHQL_RATE_LIMIT = 5000
+GRAPHQL_REACTIONS = {
+    "+1": "THUMBS_UP",
+    "-1": "THUMBS_DOWN",
+    "laugh": "LAUGH",
+    "hooray": "HOORAY",
+    "confused": "CONFUSED",
+    "heart": "HEART",
+    "rocket": "ROCKET",
+    "eyes": "EYES",
+}
+SEARCH_PHRASE_RE = re.compile(r'"([^"]*)"')
+SEARCH_QUALIFIER_RE = re.compile(r"(\w+):(\S+)")
+
+
+class FakeGitHub:
+    """A single-repository GitHub API served from memory on a loopback port.
+
+    ``latency`` is slept (in seconds) before answering each request. ``rate_limit`` and
+    ``search_rate_limit`` cap the requests per window of the core and search resources
+    before the server answers 403 like GitHub does.
+    """
+
+    def __init__(
+        self,
+        repository: str = DEFAULT_REPOSITORY,
+        latency: float = 0.0,
+        rate_limit: int = DEFAULT_RATE_LIMIT,
+        search_rate_limit: int = DEFAULT_SEARCH_RATE_LIMIT,
+    ):
+        self.repository = repository
+        self.latency = latency
+        self.limits = {
+            "core": (rate_limit, RATE_LIMIT_WINDOW_SECONDS),
+            "search": (search_rate_limit, SEARCH_RATE_LIMIT_WINDOW_SECONDS),
+            "graphql": (GRAPHQL_RATE_LIMIT, RATE_LIMIT_WINDOW_SECONDS),
+        }
+        self.labels: dict[str, dict] = {}
+        self.issues: dict[int, dict] = {}
+        self.comments: dict[int, list[dict]] = {}
+        self.viewer_reactions: set[tuple[int, str]] = set()
+        self.calls: Counter = Counter()
+        self.lock = threading.Lock()
+        self.rate_used = {resource: 0 for resource in self.limits}
+        self.rate_reset = {
+            resource: int(time.time()) + window for resource, (_, window) in self.limits.items()
+        }
+        self._next_number = 1
+        self._next_id = 1
+        self._server = None
+        self._thread = None
+        self._routes = self._build_routes()
+
+    def __enter__(self) -> "FakeGitHub":
+        self.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def total_calls(self) -> int:
+        return sum(self.calls.values())
+
+    def start(self) -> None:
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        self._server.daemon_threads = True
+        self._server.fake = self
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._server is None:
+            return
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+        self._server = None
+
+    def reset_counters(self) -> None:
+        with self.lock:
+            self.calls.clear()
+            self.rate_used = {resource: 0 for resource in self.limits}
+
+    def seed_label(self, name: str, color: str = "ededed", description: str = "") -> dict:
+        with self.lock:
+            return self._add_label(name, color, description)
+
+    def seed_issue(
+        self,
+        title: str,
+        body: str,
+        labels: list[str] = (),
+        state: str = "open",
+        reactions: dict[str, int] = None,
+    ) -> dict:
+        with self.lock:
+            issue = self._add_issue(title, body, list(labels))
+            issue["state"] = state
+            if state == "closed":
+                issue["state_reason"] = "completed"
+            for content, count in (reactions or {}).items():
+                issue["reactions"][content] = count
+                issue["reactions"]["total_count"] += count
+            return issue
+
+    # --- request handling -------------------------------------------------------------
+
+    def _build_routes(self) -> list[tuple[str, str, str, re.Pattern, callable]]:
+        repo_routes = [
+            ("GET", "/labels/{name}", self._get_label),
+            ("POST", "/labels", self._create_label),
+            ("GET", "/issues", self._list_issues),
+            ("POST", "/issues", self._create_issue),
+            ("GET", "/issues/{number}", self._get_issue),
+            ("PATCH", "/issues/{number}", self._update_issue),
+            ("GET", "/issues/{number}/comments", self._list_comments),
+            ("POST", "/issues/{number}/comments", self._create_comment),
+            ("POST", "/issues/{number}/reactions", self._create_reaction),
+        ]
+        api_routes = [
+            ("GET", "/search/issues", self._search_issues),
+            ("POST", "/graphql", self._graphql),
+        ]
+
+        compiled = []
+        for prefix, routes in ((f"/repos/{self.repository}", repo_routes), ("", api_routes)):
+            for method, template, handler in routes:
+                pattern = re.sub(r"\\\{(\w+)\\\}", r"(?P<\1>[^/]+)", re.escape(template))
+                resource = template.split("/")[1] if not prefix else "core"
+                compiled.append(
+                    (method, template, resource, re.compile(f"^{re.escape(prefix)}{pattern}$"), handler)
+                )
+        return compiled
+
+    def handle(self, method: str, target: str, payload) -> tuple[int, object, dict]:
+        if self.latency:
+            time.sleep(self.latency)
+
+        parsed = urlparse(target)
+        query = {k: v[-1] for k, v in parse_qs(parsed.query).items()}
+
+        with self.lock:
+            for route_method, template, resource, pattern, handler in self._routes:
+                match = pattern.match(parsed.path)
+                if route_method != method or not match:
+                    continue
+
+                self.calls[f"{method} {template}"] += 1
+                limit, window = self.limits[resource]
+                now = int(time.time())
+                if now >= self.rate_reset[resource]:
+                    self.rate_used[resource] = 0
+                    self.rate_reset[resource] = now + window
+                if self.rate_used[resource] >= limit:
+                    return 403, {"message": "API rate limit exceeded"}, self._rate_headers(resource)
+                self.rate_used[resource] += 1
+
+                status, body, extra = handler(match.groupdict(), query, payload)
+                return status, body, {**self._rate_headers(resource), **extra}
+
+            self.calls[f"{method} <unrouted>"] += 1
+            return 404, {"message": "Not Found"}, self._rate_headers("core")
+
+    def _rate_headers(self, resource: str) -> dict:
+        limit, _ = self.limits[resource]
+        used = self.rate_used[resource]
+        return {
+            "X-RateLimit-Limit": str(limit),
+            "X-RateLimit-Remaining": str(max(limit - used, 0)),
+            "X-RateLimit-Used": str(used),
+            "X-RateLimit-Reset": str(self.rate_reset[resource]),
+            "X-RateLimit-Resource": resource,
+        }
+
+    def _page_links(self, path: str, query: dict, page: int, last: int) -> dict:
+        def link(target_page: int, rel: str) -> str:
+            params = urlencode({**query, "page": target_page})
+            return f'<{self.url}{path}?{params}>; rel="{rel}"'
+
+        links = []
+        if page < last:
+            links += [link(page + 1, "next"), link(last, "last")]
+        if page > 1:
+            links += [link(1, "first"), link(page - 1, "prev")]
+        return {"Link": ", ".join(links)} if links else {}
+
+    def _paginate(self, items: list, path: str, query: dict) -> tuple[int, list, dict]:
+        per_page = min(int(query.get("per_page", 30)), MAX_PER_PAGE)
+        page = max(int(query.get("page", 1)), 1)
+        last = max((len(items) + per_page - 1) // per_page, 1)
+        start = (page - 1) * per_page
+        return 200, items[start : start + per_page], self._page_links(path, query, page, last)
+
+    def _find_issue(self, params: dict):
+        number = params["number"]
+        return self.issues.get(int(number)) if number.isdigit() else None
+
+    def _get_label(self, params, query, payload):
+        label = self.labels.get(params["name"])
+        if label is None:
+            return 404, {"message": "Not Found"}, {}
+        return 200, label, {}
+
+    def _create_label(self, params, query, payload):
+        name = payload.get("name", "")
+        if not name or name in self.labels:
+            return 422, {"message": "Validation Failed"}, {}
+        label = self._add_label(name, payload.get("color", "ededed"), payload.get("description", ""))
+        return 201, label, {}
+
+    def _list_issues(self, params, query, payload):
+        state = query.get("state", "open")
+        wanted = {name for name in query.get("labels", "").split(",") if name}
+        issues = []
+        for number in sorted(self.issues, reverse=True):
+            issue = self.issues[number]
+            if state != "all" and issue["state"] != state:
+                continue
+            if wanted and not wanted <= {label["name"] for label in issue["labels"]}:
+                continue
+            issues.append(issue)
+        return self._paginate(issues, f"/repos/{self.repository}/issues", query)
+
+    def _search_issues(self, params, query, payload):
+        # Only the subset ensure_issues.py sends: repo/label/state/is qualifiers plus
+        # quoted phrases, where any phrase matching the body is a hit (phrases are OR-ed).
+        q = query.get("q", "")
+        phrases = [phrase.lower() for phrase in SEARCH_PHRASE_RE.findall(q)]
+        qualifiers = SEARCH_QUALIFIER_RE.findall(SEARCH_PHRASE_RE.sub("", q))
+
+        items = []
+        for number in sorted(self.issues, reverse=query.get("order", "desc") == "desc"):
+            issue = self.issues[number]
+            labels = {label["name"] for label in issue["labels"]}
+            if not all(_search_qualifier_matches(self.repository, issue, labels, k, v) for k, v in qualifiers):
+                continue
+            body = (issue.get("body") or "").lower()
+            if phrases and not any(phrase in body for phrase in phrases):
+                continue
+            items.append(issue)
+
+        status, page, headers = self._paginate(items, "/search/issues", query)
+        return status, {"total_count": len(items), "incomplete_results": False, "items": page}, headers
+
+    def _graphql(self, params, query, payload):
+        if "query PluginIssues" not in payload.get("query", ""):
+            return 200, {"errors": [{"message": "Unsupported query"}]}, {}
+
+        variables = payload.get("variables") or {}
+        if f"{variables.get('owner')}/{variables.get('name')}" != self.repository:
+            return 200, {"data": {"repository": None}, "errors": [{"message": "Could not resolve to a Repository"}]}, {}
+
+        label = variables.get("label")
+        numbers = [
+            number
+            for number in sorted(self.issues)
+            if not label or label in {entry["name"] for entry in self.issues[number]["labels"]}
+        ]
+        after = int(variables.get("after") or 0)
+        page = [number for number in numbers if number > after][:MAX_PER_PAGE]
+        nodes = [self._graphql_issue(self.issues[number]) for number in page]
+        has_next = bool(page) and page[-1] != numbers[-1]
+        page_info = {"hasNextPage": has_next, "endCursor": str(page[-1]) if page else None}
+        data = {"repository": {"issues": {"pageInfo": page_info, "nodes": nodes}}}
+        return 200, {"data": data}, {}
+
+    def _graphql_issue(self, issue: dict) -> dict:
+        return {
+            "number": issue["number"],
+            "state": issue["state"].upper(),
+            "body": issue["body"],
+            "labels": {"nodes": [{"name": label["name"]} for label in issue["labels"]]},
+            "reactionGroups": [
+                {
+                    "content": content,
+                    "viewerHasReacted": (issue["number"], rest) in self.viewer_reactions,
+                    "reactors": {"totalCount": issue["reactions"][rest]},
+                }
+                for rest, content in GRAPHQL_REACTIONS.items()
+            ],
+        }
+
+    def _create_issue(self, params, query, payload):
+        if not payload.get("title"):
+            return 422, {"message": "Validation Failed"}, {}
+        issue = self._add_issue(payload["title"], payload.get("body", ""), payload.get("labels", []))
+        return 201, issue, {}
+
+    def _get_issue(self, params, query, payload):
+        issue = self._find_issue(params)
+        if issue is None:
+            return 404, {"message": "Not Found"}, {}
+        return 200, issue, {}
+
+    def _update_issue(self, params, query, payload):
+        issue = self._find_issue(params)
+        if issue is None:
+            return 404, {"message": "Not Found"}, {}
+        for field in ("title", "body", "state", "state_reason"):
+            if field in payload:
+                issue[field] = payload[field]
+        if payload.get("state") == "open":
+            issue["state_reason"] = "reopened"
+        if "labels" in payload:
+            issue["labels"] = [self._label(name) for name in payload["labels"]]
+        issue["updated_at"] = _timestamp()
+        return 200, issue, {}
+
+    def _list_comments(self, params, query, payload):
+        if self._find_issue(params) is None:
+            return 404, {"message": "Not Found"}, {}
+        comments = self.comments.get(int(params["number"]), [])
+        path = f"/repos/{self.repository}/issues/{params['number']}/comments"
+        return self._paginate(comments, path, query)
+
+    def _create_comment(self, params, query, payload):
+        issue = self._find_issue(params)
+        if issue is None:
+            return 404, {"message": "Not Found"}, {}
+        comment = {"id": self._take_id(), "body": payload.get("body", ""), "created_at": _timestamp()}
+        self.comments.setdefault(issue["number"], []).append(comment)
+        issue["comments"] += 1
+        return 201, comment, {}
+
+    def _create_reaction(self, params, query, payload):
+        issue = self._find_issue(params)
+        if issue is None:
+            return 404, {"message": "Not Found"}, {}
+        content = payload.get("content", "")
+        if content not in issue["reactions"] or content == "total_count":
+            return 422, {"message": "Validation Failed"}, {}
+        issue["reactions"][content] += 1
+        issue["reactions"]["total_count"] += 1
+        self.viewer_reactions.add((issue["number"], content))
+        return 201, {"id": self._take_id(), "content": content}, {}
+
+    # --- storage ----------------------------------------------------------------------
+
+    def _take_id(self) -> int:
+        value = self._next_id
+        self._next_id += 1
+        return value
+
+    def _add_label(self, name: str, color: str, description: str) -> dict:
+        label = {"id": self._take_id(), "name": name, "color": color, "description": description}
+        self.labels[name] = label
+        return label
+
+    def _label(self, name: str) -> dict:
+        return self.labels.get(name) or self._add_label(name, "ededed", "")
+
+    def _add_issue(self, title: str, body: str, labels: list[str]) -> dict:
+        number = self._next_number
+        self._next_number += 1
+        now = _timestamp()
+        issue = {
+            "id": self._take_id(),
+            "number": number,
+            "title": title,
+            "body": body,
+            "state": "open",
+            "state_reason": None,
+            "labels": [self._label(name) for name in labels],
+            "comments": 0,
+            "html_url": f"https://github.com/{self.repository}/issues/{number}",
+            "created_at": now,
+            "updated_at": now,
+            "reactions": {
+                "total_count": 0,
+                "+1": 0,
+                "-1": 0,
+                "laugh": 0,
+                "hooray": 0,
+                "confused": 0,
+                "heart": 0,
+                "rocket": 0,
+                "eyes": 0,
+            },
+        }
+        self.issues[number] = issue
+        return issue
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def _dispatch(self) -> None:
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length) if length else b""
+        try:
+            payload = json.loads(raw) if raw else {}
+        except json.JSONDecodeError:
+            self._send(400, {"message": "Problems parsing JSON"}, {})
+            return
+
+        status, body, headers = self.server.fake.handle(self.command, self.path, payload)
+        self._send(status, body, headers)
+
+    def _send(self, status: int, body, headers: dict) -> None:
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    do_GET = do_POST = do_PATCH = do_PUT = do_DELETE = _dispatch
+
+    def log_message(self, format, *args) -> None:
+        pass
+
+
+def _search_qualifier_matches(repository: str, issue: dict, labels: set[str], key: str, value: str) -> bool:
+    if key == "repo":
+        return value.lower() == repository.lower()
+    if key == "label":
+        return value in labels
+    if key in ("is", "state") and value in ("open", "closed"):
+        return issue["state"] == value
+    return True
+
+
+def _timestamp() -> str:
+    return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
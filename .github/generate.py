@@ -210,13 +210,19 @@ def load_themes(themes_dir: Path) -> list[dict]:
             continue
 
         try:
-            with open(theme_file) as f:
-                theme_data = json.load(f)
-                theme_data["_dirname"] = theme_dir.name
+            theme_bytes = theme_file.read_bytes()
+            theme_data = json.loads(theme_bytes)
+            theme_data["_dirname"] = theme_dir.name
+            # wcag.json is written by check_wcag.py --write; only score the theme
+            # here when that report is missing or was made for an older theme.json.
+            report = check_wcag.load_cached_report(
+                theme_dir, check_wcag.source_hash(theme_bytes)
+            )
+            if report is None:
                 report = check_wcag.theme_report(theme_data)
-                if report:
-                    theme_data["_wcag_badge"] = check_wcag.badge_markdown(report)
-                themes.append(theme_data)
+            if report:
+                theme_data["_wcag_badge"] = check_wcag.badge_markdown(report)
+            themes.append(theme_data)
         except (json.JSONDecodeError, Exception) as e:
             print(f"Error reading {theme_file}: {e}", file=sys.stderr)
             sys.exit(1)
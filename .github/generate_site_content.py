@@ -1,9 +1,17 @@
 #!/usr/bin/env python3
 """Generate site content from plugins/*.json files."""
 
+import argparse
+import hashlib
 import json
+import os
+import posixpath
+import re
+import subprocess
 import sys
-from datetime import datetime
+import tempfile
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, timezone
 from pathlib import Path
 from typing import Optional
 from urllib.parse import urlparse
@@ -11,6 +19,62 @@ from urllib.parse import urlparse
 import requests
 from jinja2 import Template
 
+import build_search_index
+from repo_archive import ARCHIVE_CACHE_DIR, ArchiveFetcher
+
+# Fetching is network-bound (a README lookup and a default-branch API call per
+# plugin), so plugins are fetched on a thread pool ahead of markdown generation.
+FETCH_WORKERS = 16
+
+# Upstream READMEs are cached on disk, keyed by (repo, path, commit SHA) of the
+# branch they were read from. A build only re-downloads READMEs whose branch moved;
+# when the SHA can't be looked up, cached entries are revalidated by ETag instead.
+README_CACHE_DIR = Path(__file__).parent.parent / ".cache" / "readmes"
+README_BRANCHES = ("main", "master")
+
+# (README content, branch the README was read from, default branch)
+PluginSources = tuple[str, Optional[str], Optional[str]]
+
+# Every reference an upstream README can make to its own repository, matched in
+# a single scan. Fenced code, code spans and comments come first in the
+# alternation so their contents are consumed, and kept, before anything inside
+# them could match. Every repetition is possessive and stops at the first
+# character that could open another match of the same kind (a "[", "<", blank
+# line or backtick run), so a failed attempt never rescans text a later attempt
+# covers and the scan stays linear in the README size, unclosed constructs
+# included (checked by bench_readme_references.py). A backtick run only opens a
+# code span when its closing run follows within _CODE_SPAN_MAX characters, which
+# bounds what every unclosed run can cost.
+_CODE_SPAN_MAX = 256
+_DESTINATION = r"<[^<>\n]*+>|[^\s()<]++(?:\([^\s()]*+\)[^\s()]*+)*+"
+_TITLE = r"""(?:[ \t]+(?:"[^"\n]*+"|'[^'\n]*+'|\([^()\n]*+\)))?[ \t]*+"""
+README_REFERENCE_RE = re.compile(
+    rf"""
+    (?P<fence>^[ ]{{0,3}}(?P<marker>`{{3,}}+|~{{3,}}+)[^\n]*+\n.*?(?:^[ ]{{0,3}}(?P=marker)|\Z))
+    | (?P<code>(?<!`)(?P<ticks>`++)(?=[^\n]{{0,{_CODE_SPAN_MAX}}}?(?<!`)(?P=ticks)(?!`))(?:[^`\n]++|(?!(?P=ticks)(?!`))`++)*+(?P=ticks)(?!`))
+    | (?P<comment><!--.*?(?:-->|\Z))
+    | !\[(?:[^\[\]\n]++|\[[^\[\]\n]*+\])*+\]\([ \t]*+(?P<image_dest>{_DESTINATION}){_TITLE}\)
+    | \]\([ \t]*+(?P<link_dest>{_DESTINATION}){_TITLE}\)
+    | ^[ ]{{0,3}}\[[^\]\n]++\]:[ \t]*+(?P<definition_dest><[^<>\n]*+>|\S++)
+    | (?P<tag><(?i:img|source|video|audio|a)\b(?:[^<>\n]++|\n(?![ \t]*+(?:\n|`{{3}}|~{{3}})))*+>)
+    """,
+    re.MULTILINE | re.DOTALL | re.VERBOSE,
+)
+HTML_ATTRIBUTE_RE = re.compile(
+    r"""\s(?P<name>src|href|srcset|poster)\s*=\s*(?:"(?P<value>[^"]*)"|'(?P<single>[^']*)')""",
+    re.IGNORECASE,
+)
+URL_SCHEME_RE = re.compile(r"[A-Za-z][A-Za-z0-9+.-]*:")
+URL_SUFFIX_RE = re.compile(r"([^?#]*)(.*)", re.DOTALL)
+IMAGE_EXTENSION_RE = re.compile(r"\.(?:png|jpe?g|gif|webp|svg|avif|bmp|ico)$", re.IGNORECASE)
+
+# site/content-manifest.json records, per generated page, hashes of what it was
+# rendered from. Pages whose inputs are unchanged are neither re-rendered nor
+# rewritten, so marmite's incremental build only sees pages that really changed.
+MANIFEST_NAME = "content-manifest.json"
+# The template and the code that fills it both live in this file, so the file
+# itself is the template fingerprint.
+TEMPLATE_HASH = hashlib.sha256(Path(__file__).read_bytes()).hexdigest()
 
 # Jinja2 template for plugin markdown content
 PLUGIN_TEMPLATE = Template(
@@ -114,92 +178,275 @@ def get_default_branch(repo_url: str) -> str:
     return "main"
 
 
-def fetch_readme(repo_url: str, path: Optional[str] = None) -> str:
+def remote_heads(repo_url: str) -> dict[str, str]:
+    """Look up the commit SHAs of the README branches with one ``git ls-remote``.
+
+    Args:
+        repo_url: Repository URL
+
+    Returns:
+        Branch name to commit SHA for the README_BRANCHES that exist, or an empty
+        dict if the lookup failed
+    """
+    try:
+        result = subprocess.run(
+            ["git", "ls-remote", repo_url, *(f"refs/heads/{b}" for b in README_BRANCHES)],
+            capture_output=True,
+            text=True,
+            timeout=10,
+            env={**os.environ, "GIT_TERMINAL_PROMPT": "0"},
+        )
+    except (OSError, subprocess.TimeoutExpired) as e:
+        print(f"Warning: Failed to look up branches of {repo_url}: {e}", file=sys.stderr)
+        return {}
+    if result.returncode != 0:
+        return {}
+
+    heads = {}
+    for line in result.stdout.splitlines():
+        sha, _, ref = line.partition("\t")
+        heads[ref.removeprefix("refs/heads/")] = sha
+    return heads
+
+
+def cache_entry_path(cache_dir: Path, *key: str) -> Path:
+    digest = hashlib.sha256(json.dumps(key).encode()).hexdigest()
+    return cache_dir / digest[:2] / f"{digest}.json"
+
+
+def load_cache_entry(cache_dir: Path, *key: str) -> Optional[dict]:
+    try:
+        with open(cache_entry_path(cache_dir, *key)) as f:
+            entry = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+    # Guard against digest collisions and hand-edited files.
+    return entry if entry.get("key") == list(key) else None
+
+
+def store_cache_entry(cache_dir: Path, entry: dict, *key: str) -> None:
+    path = cache_entry_path(cache_dir, *key)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Write then rename, so a concurrent reader never sees a partial entry.
+    with tempfile.NamedTemporaryFile("w", dir=path.parent, delete=False) as f:
+        json.dump({"key": list(key), **entry}, f)
+    os.replace(f.name, path)
+
+
+def fetch_readme(
+    repo_url: str, path: Optional[str] = None, cache_dir: Optional[Path] = None
+) -> tuple[str, Optional[str]]:
     """Fetch README.md from a GitHub repository.
 
     Args:
         repo_url: GitHub repository URL (e.g., https://github.com/author/repo)
         path: Optional subdirectory path for monorepos
+        cache_dir: README cache directory; None fetches every README
 
     Returns:
-        README content as string, or error message if not found
+        (README content, branch it was read from), or an error message and None
+        if not found
     """
     # Extract owner and repo name from URL
     # https://github.com/author/repo -> author/repo
     parts = repo_url.rstrip("/").split("github.com/")
     if len(parts) != 2:
-        return f"<!-- Could not parse repository URL: {repo_url} -->"
+        return f"<!-- Could not parse repository URL: {repo_url} -->", None
 
     owner_repo = parts[1]
+    readme_path = f"{path}/README.md" if path else "README.md"
+    heads = remote_heads(repo_url) if cache_dir else {}
 
     # Build raw.githubusercontent.com URL
     # Try both main and master branches
-    for branch in ["main", "master"]:
-        if path:
-            # Monorepo: https://raw.githubusercontent.com/author/repo/main/path/README.md
-            raw_url = f"https://raw.githubusercontent.com/{owner_repo}/{branch}/{path}/README.md"
-        else:
-            # Regular repo: https://raw.githubusercontent.com/author/repo/main/README.md
-            raw_url = (
-                f"https://raw.githubusercontent.com/{owner_repo}/{branch}/README.md"
-            )
+    for branch in README_BRANCHES:
+        sha = heads.get(branch)
+        if heads and sha is None:
+            # The lookup worked and the branch doesn't exist
+            continue
+
+        # Regular repo: https://raw.githubusercontent.com/author/repo/main/README.md
+        # Monorepo: https://raw.githubusercontent.com/author/repo/main/path/README.md
+        # With a SHA the URL is pinned to the commit the cache entry is keyed by.
+        raw_url = f"https://raw.githubusercontent.com/{owner_repo}/{sha or branch}/{readme_path}"
+
+        headers = {}
+        cached = None
+        if sha:
+            cache_key = (owner_repo, readme_path, sha)
+            cached = load_cache_entry(cache_dir, *cache_key)
+            if cached is not None:
+                # A commit's README never changes; a missing one stays missing.
+                if cached["content"] is None:
+                    continue
+                return cached["content"], branch
+        elif cache_dir:
+            cache_key = (owner_repo, readme_path, branch)
+            cached = load_cache_entry(cache_dir, *cache_key)
+            if cached is not None and cached.get("etag"):
+                headers["If-None-Match"] = cached["etag"]
 
         try:
-            response = requests.get(raw_url, timeout=10)
-            if response.status_code == 200:
-                return response.text
+            response = requests.get(raw_url, headers=headers, timeout=10)
         except requests.RequestException as e:
             print(f"Warning: Failed to fetch {raw_url}: {e}", file=sys.stderr)
             continue
 
-    return f"<!-- README not found for {repo_url} -->"
+        if response.status_code == 304 and cached is not None:
+            return cached["content"], branch
+        if response.status_code == 200:
+            if cache_dir:
+                entry = {"content": response.text, "etag": response.headers.get("ETag")}
+                store_cache_entry(cache_dir, entry, *cache_key)
+            return response.text, branch
+        if sha and response.status_code == 404:
+            store_cache_entry(cache_dir, {"content": None, "etag": None}, *cache_key)
+
+    return f"<!-- README not found for {repo_url} -->", None
+
+
+def fetch_plugin_sources(
+    plugin: dict,
+    cache_dir: Optional[Path] = None,
+    archives: Optional[ArchiveFetcher] = None,
+) -> PluginSources:
+    """Fetch everything generate_markdown needs from the plugin's repository.
+
+    Args:
+        plugin: Plugin data dictionary
+        cache_dir: README cache directory; None fetches the README uncached
+        archives: Repository snapshots to read from first; the README and default
+            branch are fetched individually when the snapshot is unavailable
+
+    Returns:
+        (README content, branch the README was read from, default branch); the
+        branches are None when there is no README or no repo
+    """
+    repo_url = plugin.get("repo", "")
+    snapshot = archives.snapshot(repo_url) if archives and repo_url else None
+    if snapshot is not None:
+        path = plugin.get("path")
+        readme_content = snapshot.read(f"{path}/README.md" if path else "README.md")
+        if readme_content is None:
+            return f"<!-- README not found for {repo_url} -->", None, snapshot.branch
+        return readme_content, snapshot.branch, snapshot.branch
+
+    readme_content, readme_branch = fetch_readme(repo_url, plugin.get("path"), cache_dir)
+    branch = get_default_branch(repo_url) if repo_url else None
+    return readme_content, readme_branch, branch
+
+
+def rewrite_readme_references(
+    readme_content: str, owner_repo: str, branch: str, path: Optional[str] = None
+) -> str:
+    """Resolve the relative references of an upstream README in one pass.
+
+    Images and HTML assets (src, srcset, poster) point at raw.githubusercontent.com,
+    links (including <a href>) at the file on github.com; reference definitions go
+    by file extension. Relative references resolve against the README's directory,
+    root-relative ones against the repository root, as GitHub renders them.
+    Nothing inside code blocks, code spans or HTML comments is touched.
 
+    Args:
+        readme_content: README markdown
+        owner_repo: Repository as owner/repo
+        branch: Branch the README was read from
+        path: Directory of the README in the repository, for monorepos
 
-def generate_markdown(plugin: dict, plugin_filename: str, current_date: str) -> str:
+    Returns:
+        README markdown with absolute references
+    """
+    raw_base = f"https://raw.githubusercontent.com/{owner_repo}/{branch}/"
+    blob_base = f"https://github.com/{owner_repo}/blob/{branch}/"
+    readme_dir = (path or "").strip("/")
+
+    def resolve(url: str, asset: bool) -> str:
+        if url.startswith("<") and url.endswith(">"):
+            return f"<{resolve(url[1:-1], asset)}>"
+        if not url or url.startswith(("#", "//")) or URL_SCHEME_RE.match(url):
+            return url
+        target, suffix = URL_SUFFIX_RE.match(url).groups()
+        if target.startswith("/"):
+            resolved = posixpath.normpath(target.lstrip("/") or ".")
+        else:
+            resolved = posixpath.normpath(posixpath.join(readme_dir, target or "."))
+        if resolved == ".." or resolved.startswith("../"):
+            return url  # points outside the repository; leave it alone
+        resolved = "" if resolved == "." else resolved
+        return (raw_base if asset else blob_base) + resolved + suffix
+
+    def replace_span(match: re.Match, group: str, value: str) -> str:
+        start, end = match.span(group)
+        text = match.group(0)
+        offset = match.start()
+        return text[: start - offset] + value + text[end - offset :]
+
+    def replace_attribute(match: re.Match) -> str:
+        group = "value" if match.group("value") is not None else "single"
+        name = match.group("name").lower()
+        value = match.group(group)
+        if name == "srcset":
+            # "a.png 1x, b.png 2x": each candidate starts with its URL
+            candidates = (c.split() for c in value.split(",") if c.strip())
+            resolved = ", ".join(
+                " ".join([resolve(url, True), *descriptors])
+                for url, *descriptors in candidates
+            )
+        else:
+            resolved = resolve(value, name != "href")
+        return replace_span(match, group, resolved)
+
+    def replace(match: re.Match) -> str:
+        if match.group("image_dest") is not None:
+            return replace_span(match, "image_dest", resolve(match.group("image_dest"), True))
+        if match.group("link_dest") is not None:
+            return replace_span(match, "link_dest", resolve(match.group("link_dest"), False))
+        if match.group("definition_dest") is not None:
+            dest = match.group("definition_dest")
+            target = URL_SUFFIX_RE.match(dest.strip("<>")).group(1)
+            asset = IMAGE_EXTENSION_RE.search(target) is not None
+            return replace_span(match, "definition_dest", resolve(dest, asset))
+        if match.group("tag") is not None:
+            return HTML_ATTRIBUTE_RE.sub(replace_attribute, match.group("tag"))
+        # Code and comments are matched only so they are skipped whole
+        return match.group(0)
+
+    return README_REFERENCE_RE.sub(replace, readme_content)
+
+
+def generate_markdown(
+    plugin: dict,
+    plugin_filename: str,
+    current_date: str,
+    sources: Optional[PluginSources] = None,
+) -> str:
     """Generate markdown content for a plugin.
 
     Args:
         plugin: Plugin data dictionary
         plugin_filename: Original JSON filename (without .json extension)
         current_date: Current date in YYYY-MM-DD format
+        sources: Prefetched fetch_plugin_sources() result; fetched here when omitted
 
     Returns:
         Markdown content with frontmatter
     """
-    import re
     from urllib.parse import quote
 
-    # Fetch README from repository
-    readme_content = fetch_readme(plugin.get("repo", ""), plugin.get("path"))
-
-    # If inside readme_content there is a relative image link, we might want to adjust it
-    # and add the repo raw URL prefix.
-    # so ![image](image.png) becomes ![image](https://raw.githubusercontent.com/author/repo/main/image.png)
-    # use regex to match ![alt](url.{png,jpg,jpeg,gif,webp})
-    def replace_relative_image(match):
-        alt_text = match.group(1)
-        img_url = match.group(2)
-        if img_url.startswith("http://") or img_url.startswith("https://"):
-            return match.group(0)  # leave unchanged
-        # Build raw URL
-        parts = plugin.get("repo", "").rstrip("/").split("github.com/")
-        if len(parts) != 2:
-            return match.group(0)  # leave unchanged
-        owner_repo = parts[1]
-        branch = "main"  # default to main
-        if plugin.get("path"):
-            raw_img_url = f"https://raw.githubusercontent.com/{owner_repo}/{branch}/{plugin['path']}/{img_url}"
-        else:
-            raw_img_url = (
-                f"https://raw.githubusercontent.com/{owner_repo}/{branch}/{img_url}"
-            )
-        return f"![{alt_text}]({raw_img_url})"
-
-    readme_content = re.sub(
-        r"!\[([^\]]*)\]\(([^)]+\.(png|jpg|jpeg|gif|webp))\)",
-        replace_relative_image,
-        readme_content,
-    )
+    # Fetch README and default branch from repository
+    if sources is None:
+        sources = fetch_plugin_sources(plugin)
+    readme_content, readme_branch, branch = sources
+
+    # Relative images, links and HTML assets in the README would resolve against
+    # the site, so point them back at the repository, on the branch the README
+    # was read from:
+    # ![image](image.png) becomes ![image](https://raw.githubusercontent.com/author/repo/main/image.png)
+    parts = plugin.get("repo", "").rstrip("/").split("github.com/")
+    if readme_branch and len(parts) == 2:
+        readme_content = rewrite_readme_references(
+            readme_content, parts[1], readme_branch, plugin.get("path")
+        )
 
     # Build tags list: capabilities + category + compositors + distro
     tags = []
@@ -227,9 +474,6 @@ def generate_markdown(plugin: dict, plugin_filename: str, current_date: str) ->
     release_badge = ""
     repo_url = plugin.get("repo", "")
     if repo_url:
-        # Get default branch dynamically
-        branch = get_default_branch(repo_url)
-
         # Parse repo URL to get owner/repo
         parts = repo_url.rstrip("/").split("github.com/")
         if len(parts) == 2:
@@ -306,64 +550,272 @@ def generate_markdown(plugin: dict, plugin_filename: str, current_date: str) ->
     return PLUGIN_TEMPLATE.render(context)
 
 
-def generate_site_content() -> int:
-    """Generate site content for all plugins."""
+def plugin_commit_dates(plugins_dir: Path) -> dict[str, str]:
+    """Map each plugin JSON filename to the date of the last commit touching it.
+
+    One ``git log`` pass over the whole directory, newest commit first, so the
+    first date seen for a file is its last change. Dates are UTC so every
+    machine renders the same page.
+
+    Args:
+        plugins_dir: Directory holding the plugin JSON files
+
+    Returns:
+        Filename to YYYY-MM-DD; empty when git or its history is unavailable
+    """
+    try:
+        result = subprocess.run(
+            ["git", "log", "--relative", "--format=%x00%ct", "--name-only", "--", "."],
+            cwd=plugins_dir,
+            capture_output=True,
+            text=True,
+        )
+    except OSError as e:
+        print(f"Warning: Failed to read plugin history: {e}", file=sys.stderr)
+        return {}
+    if result.returncode != 0:
+        return {}
+
+    dates = {}
+    date = None
+    for line in result.stdout.splitlines():
+        if line.startswith("\0"):
+            timestamp = int(line[1:])
+            date = datetime.fromtimestamp(timestamp, timezone.utc).strftime("%Y-%m-%d")
+        elif line and date is not None:
+            dates.setdefault(line, date)
+    return dates
+
+
+def sha256_hex(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def page_inputs(plugin: dict, sources: PluginSources, current_date: str) -> dict:
+    """Everything a plugin page is rendered from, as recorded in the manifest."""
+    readme_content, readme_branch, branch = sources
+    return {
+        "plugin": sha256_hex(json.dumps(plugin, sort_keys=True).encode()),
+        "readme": sha256_hex(readme_content.encode()),
+        "template": TEMPLATE_HASH,
+        "readmeBranch": readme_branch,
+        "branch": branch,
+        "date": current_date,
+    }
+
+
+def load_manifest(manifest_path: Path) -> dict:
+    try:
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
+    return manifest if isinstance(manifest, dict) else {}
+
+
+def page_is_current(output_path: Path, entry: Optional[dict], inputs: dict) -> bool:
+    # Current when rendered from these exact inputs and still on disk as written.
+    if not isinstance(entry, dict):
+        return False
+    if {key: value for key, value in entry.items() if key != "page"} != inputs:
+        return False
+    try:
+        return sha256_hex(output_path.read_bytes()) == entry["page"]
+    except OSError:
+        return False
+
+
+def generate_site_content(
+    jobs: int = FETCH_WORKERS,
+    cache_dir: Optional[Path] = README_CACHE_DIR,
+    force: bool = False,
+    use_archives: bool = True,
+) -> int:
+    """Generate site content for all plugins.
+
+    Args:
+        jobs: Number of plugins fetched concurrently
+        cache_dir: README cache directory; None disables the cache, of archive
+            snapshots too
+        force: Re-render every page, ignoring the manifest
+        use_archives: Read READMEs and default branches from one archive per
+            repository (see repo_archive.py) before fetching them individually
+    """
     repo_root = Path(__file__).parent.parent
     plugins_dir = repo_root / "plugins"
     content_dir = repo_root / "site" / "content"
+    manifest_path = content_dir.parent / MANIFEST_NAME
 
     # Ensure content directory exists
     content_dir.mkdir(parents=True, exist_ok=True)
 
-    # Process each plugin JSON file
-    processed_count = 0
+    # Load each plugin JSON file
     error_count = 0
+    json_files = list(plugins_dir.glob("*.json"))
+    plugins: dict[Path, dict] = {}
+    for json_file in json_files:
+        try:
+            with open(json_file) as f:
+                plugins[json_file] = json.load(f)
+        except json.JSONDecodeError as e:
+            print(f"Error parsing {json_file}: {e}", file=sys.stderr)
+            error_count += 1
+        except Exception as e:
+            print(f"Error processing {json_file}: {e}", file=sys.stderr)
+            error_count += 1
 
-    for json_file in plugins_dir.glob("*.json"):
-
-        # current date must be the date the json file was last edited
-        #
-        # current_date = datetime.now().strftime('%Y-%m-%d')
-        current_date = datetime.fromtimestamp(json_file.stat().st_mtime).strftime(
-            "%Y-%m-%d"
+    manifest = load_manifest(manifest_path)
+    pages: dict[str, dict] = {}
+    dates = plugin_commit_dates(plugins_dir)
+
+    archives = None
+    if use_archives:
+        archives = ArchiveFetcher(ARCHIVE_CACHE_DIR if cache_dir else None)
+
+    # Start every fetch up front; results are collected in file order below, and
+    # a failed fetch surfaces as that plugin's error from future.result().
+    with ThreadPoolExecutor(max_workers=max(jobs, 1)) as pool:
+        fetches: dict[Path, Future] = {
+            json_file: pool.submit(fetch_plugin_sources, plugin_data, cache_dir, archives)
+            for json_file, plugin_data in plugins.items()
+        }
+        processed_count, up_to_date = write_plugin_pages(
+            plugins, fetches, dates, content_dir, {} if force else manifest, pages
         )
 
-        try:
-            # Load plugin data
-            with open(json_file) as f:
-                plugin_data = json.load(f)
+    # Pages of plugins that failed this run keep their entry, so they are
+    # neither lost nor mistaken for deleted plugins.
+    for json_file in json_files:
+        name = json_file.stem + ".md"
+        if name not in pages and name in manifest:
+            pages[name] = manifest[name]
+
+    # Only pages this script generated are removed; hand-written ones such as
+    # _hero.md are never in the manifest.
+    for name in sorted(set(manifest) - set(pages)):
+        (content_dir / name).unlink(missing_ok=True)
+        print(f"Removed: {name}")
+
+    if pages != manifest:
+        with open(manifest_path, "w") as f:
+            json.dump(pages, f, indent=2, sort_keys=True)
+            f.write("\n")
+
+    error_count += len(plugins) - processed_count
+    if up_to_date:
+        print(f"{up_to_date} page(s) already up to date")
+    if archives is not None:
+        print(f"{archives.downloads} repository archive(s) downloaded")
+
+    # Final stage: the client-side search index over the pages just written
+    build_search_index.write_search_index(
+        plugins_dir, content_dir, build_search_index.SEARCH_INDEX_DIR
+    )
+    print(f"\nProcessed {processed_count} plugins")
+    if error_count > 0:
+        print(f"Encountered {error_count} errors", file=sys.stderr)
+        return 1
+
+    return 0
+
+
+def write_plugin_pages(
+    plugins: dict[Path, dict],
+    fetches: dict[Path, Future],
+    dates: dict[str, str],
+    content_dir: Path,
+    manifest: dict,
+    pages: dict[str, dict],
+) -> tuple[int, int]:
+    """Write the plugin pages that changed as their fetches complete.
 
+    Pages are dated from ``dates`` (see plugin_commit_dates). Records each
+    page's manifest entry in ``pages``.
+
+    Returns:
+        (pages processed, pages left untouched because they were up to date)
+    """
+    processed_count = 0
+    up_to_date = 0
+    for json_file, plugin_data in plugins.items():
+
+        # current date must be the date the json file was last edited: its last
+        # commit, since a fresh checkout sets every mtime to the checkout time.
+        # The mtime is only used for files git has no history for yet.
+        current_date = dates.get(json_file.name) or datetime.fromtimestamp(
+            json_file.stat().st_mtime
+        ).strftime("%Y-%m-%d")
+
+        try:
             # Generate output filename based on JSON filename
             # e.g., rochacbruno-calculator.json -> rochacbruno-calculator.md
             output_filename = json_file.stem + ".md"
             output_path = content_dir / output_filename
 
+            sources = fetches[json_file].result()
+            inputs = page_inputs(plugin_data, sources, current_date)
+            entry = manifest.get(output_filename)
+            if page_is_current(output_path, entry, inputs):
+                pages[output_filename] = entry
+                processed_count += 1
+                up_to_date += 1
+                continue
+
             # Generate markdown content
             markdown_content = generate_markdown(
-                plugin_data, json_file.stem, current_date
+                plugin_data, json_file.stem, current_date, sources
             )
+            data = markdown_content.encode()
+            pages[output_filename] = {**inputs, "page": sha256_hex(data)}
+            processed_count += 1
 
-            # Write to file
-            with open(output_path, "w") as f:
-                f.write(markdown_content)
+            # Write to file, unless it already holds exactly this page
+            if output_path.exists() and output_path.read_bytes() == data:
+                up_to_date += 1
+                continue
+            output_path.write_bytes(data)
 
             print(f"Generated: {output_filename}")
-            processed_count += 1
 
-        except json.JSONDecodeError as e:
-            print(f"Error parsing {json_file}: {e}", file=sys.stderr)
-            error_count += 1
         except Exception as e:
             print(f"Error processing {json_file}: {e}", file=sys.stderr)
-            error_count += 1
 
-    print(f"\nProcessed {processed_count} plugins")
-    if error_count > 0:
-        print(f"Encountered {error_count} errors", file=sys.stderr)
-        return 1
-
-    return 0
+    return processed_count, up_to_date
 
 
 if __name__ == "__main__":
-    sys.exit(generate_site_content())
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=FETCH_WORKERS,
+        help=f"plugins fetched concurrently (default: {FETCH_WORKERS})",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        type=Path,
+        default=README_CACHE_DIR,
+        help="upstream README cache (default: .cache/readmes)",
+    )
+    parser.add_argument(
+        "--no-cache", action="store_true", help="fetch every README from upstream"
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="re-render every page even if its inputs are unchanged",
+    )
+    parser.add_argument(
+        "--no-archives",
+        action="store_true",
+        help="fetch READMEs and default branches one request at a time",
+    )
+    args = parser.parse_args()
+    sys.exit(
+        generate_site_content(
+            args.jobs,
+            None if args.no_cache else args.cache_dir,
+            args.force,
+            not args.no_archives,
+        )
+    )
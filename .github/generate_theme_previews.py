@@ -1,9 +1,25 @@
 #!/usr/bin/env python3
 """Generate SVG preview images for themes."""
 
+import argparse
+import gzip
+import hashlib
 import json
+import os
+import re
+import string
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 from html import escape as xml_escape
 from pathlib import Path
+from typing import Optional
+
+import theme_model
+
+try:
+    import brotli
+except ImportError:  # --minify then writes only the .svgz siblings
+    brotli = None
 
 # Mirrors how DankMaterialShell composes a desktop: the bar and popouts fill
 # with surfaceContainer, nested cards step up to surfaceContainerHigh, input
@@ -55,6 +71,20 @@ SINGLE_TEMPLATE = """<svg xmlns="http://www.w3.org/2000/svg" width="280" height=
   {panel}
 </svg>"""
 
+# One panel <symbol> whose fills are CSS custom properties, plus one class per
+# variant that sets them. A page that inlines the file renders any variant with
+# <svg class="..."><use href="#...-panel"/></svg>; opened on its own it shows the
+# default variant.
+SPRITE_TEMPLATE = """<svg xmlns="http://www.w3.org/2000/svg" width="280" height="240" viewBox="0 0 280 240" class="{default}">
+<style>
+{palettes}
+</style>
+<symbol id="{prefix}-panel" viewBox="0 0 280 240">
+  {panel}
+</symbol>
+<use href="#{prefix}-panel"/>
+</svg>"""
+
 FONT_STACK = "system-ui, -apple-system, Segoe UI, sans-serif"
 
 PANEL_KEYS = {
@@ -63,217 +93,514 @@ PANEL_KEYS = {
     "primary", "primaryText", "secondary", "error", "warning", "info",
 }
 
+# Missing keys resolve exactly as WCAG scoring sees them (theme_model.FALLBACKS).
+PANEL_FALLBACKS = theme_model.FALLBACKS
+
+# --minify hoists the font stack every <text> repeats into one rule.
+MINIFIED_STYLE = f"<style>text{{font-family:{FONT_STACK}}}</style>"
+
+# previews.json in each theme directory records what the previews were rendered
+# from and the hash of every file written, so untouched themes are skipped. The
+# templates are folded into sourceHash so a template change re-renders all.
+MANIFEST_NAME = "previews.json"
+RENDER_FINGERPRINT = json.dumps(
+    [PANEL_TEMPLATE, COMBINED_TEMPLATE, SINGLE_TEMPLATE, FONT_STACK, sorted(PANEL_KEYS), PANEL_FALLBACKS]
+).encode()
+SPRITE_FINGERPRINT = SPRITE_TEMPLATE.encode()
+# The only names a preview file can have; anything else previews.json lists is
+# never opened or removed, and --force treats every match it didn't render as stale.
+PREVIEW_FILE_RE = re.compile(r"preview(?:-[\w-]+)?\.(?:svg|svgz|svg\.br)")
+
+
+def compile_panel(template: str) -> tuple[tuple[str, ...], tuple[str, ...]]:
+    # Splits the template at the fields that change from panel to panel and
+    # turns each piece in between into a %-mapping format string, so colors are
+    # substituted once per scheme in C and a render is a join of a few strings.
+    pieces, fields, current = [], [], []
+    for literal, field, _, _ in string.Formatter().parse(template):
+        current.append(literal.replace("%", "%%"))
+        if field is None:
+            continue
+        if field in PANEL_DYNAMIC_FIELDS:
+            pieces.append("".join(current))
+            fields.append(field)
+            current = []
+        else:
+            current.append(f"%({field})s")
+    pieces.append("".join(current))
+    return tuple(pieces), tuple(fields)
 
-# Fallbacks match DankMaterialShell Common/Theme.qml, which derives missing
-# container steps from the ones a theme does define.
-PANEL_FALLBACKS = {
-    "surfaceContainer": "surface",
-    "surfaceContainerHigh": "surfaceContainer",
-    "surfaceContainerHighest": "surfaceContainerHigh",
-    "surfaceVariantText": "surfaceText",
-    "background": "surface",
-    "secondary": "primary",
-    "info": "primary",
-    "warning": "error",
-}
+
+# Everything else in a panel is fixed by its scheme.
+PANEL_DYNAMIC_FIELDS = ("x", "name")
+PANEL_PIECES, PANEL_FIELDS = compile_panel(PANEL_TEMPLATE)
 
 
 def resolve_panel_colors(scheme: dict) -> dict:
-    colors = {k: v for k, v in scheme.items() if k in PANEL_KEYS}
-    for key in PANEL_KEYS:
-        if key in colors:
-            continue
-        fallback = PANEL_FALLBACKS.get(key)
-        while fallback and fallback not in colors:
-            fallback = PANEL_FALLBACKS.get(fallback)
-        colors[key] = colors.get(fallback, "#808080")
-    return colors
+    # Keys neither the theme nor a fallback provides are drawn neutral gray.
+    colors = theme_model.resolve_fallbacks(scheme)
+    return {key: colors.get(key, "#808080") for key in sorted(PANEL_KEYS)}
+
+
+def bind_panel(colors: dict) -> tuple[str, ...]:
+    """Substitute resolved colors into the panel; render_panel fills in the rest."""
+    values = {**colors, "font": FONT_STACK}
+    return tuple(piece % values for piece in PANEL_PIECES)
+
+
+def render_panel(bound: tuple[str, ...], name: str, x: int) -> str:
+    values = {"x": x, "name": xml_escape(name)}
+    parts = [bound[0]]
+    for field, piece in zip(PANEL_FIELDS, bound[1:]):
+        parts.append(str(values[field]))
+        parts.append(piece)
+    return "".join(parts)
 
 
 def generate_panel(scheme: dict, name: str, x: int) -> str:
-    colors = resolve_panel_colors(scheme)
-    return PANEL_TEMPLATE.format(
-        x=x, name=xml_escape(name), font=FONT_STACK, **colors
-    )
+    return render_panel(bind_panel(resolve_panel_colors(scheme)), name, x)
 
 
-def generate_combined_preview(theme: dict) -> str:
-    name = theme.get("name", "Theme")
-    dark_panel = generate_panel(theme["dark"], f"{name} (dark)", 0)
-    light_panel = generate_panel(theme["light"], f"{name} (light)", 284)
-    return COMBINED_TEMPLATE.format(dark_panel=dark_panel, light_panel=light_panel)
+class ConfigPanels:
+    """Resolved colors and bound panel of each config of one theme, made on first use.
+
+    A config shows up in several previews (its own, a combined one, the defaults)
+    and in the sprite, so it is resolved and bound once and then only rendered.
+    Configs are keyed by identity; the caller keeps them alive for the lifetime
+    of the cache.
+    """
 
+    def __init__(self):
+        self._colors: dict[int, dict] = {}
+        self._bound: dict[int, tuple[str, ...]] = {}
 
-def generate_single_preview(scheme: dict, name: str) -> str:
-    panel = generate_panel(scheme, name, 0)
-    return SINGLE_TEMPLATE.format(panel=panel)
+    def colors(self, config) -> dict:
+        colors = self._colors.get(id(config))
+        if colors is None:
+            colors = self._colors[id(config)] = resolve_panel_colors(config.scheme)
+        return colors
 
+    def bound(self, config) -> tuple[str, ...]:
+        bound = self._bound.get(id(config))
+        if bound is None:
+            bound = self._bound[id(config)] = bind_panel(self.colors(config))
+        return bound
 
-def resolve_variant(
-    base_dark: dict, base_light: dict, variant: dict
-) -> tuple[dict, dict]:
-    dark = {**base_dark, **variant.get("dark", {})}
-    light = {**base_light, **variant.get("light", {})}
-    return dark, light
 
+def generate_combined_preview(dark: tuple[str, ...], light: tuple[str, ...], name: str) -> str:
+    dark_panel = render_panel(dark, f"{name} (dark)", 0)
+    light_panel = render_panel(light, f"{name} (light)", 284)
+    return COMBINED_TEMPLATE.format(dark_panel=dark_panel, light_panel=light_panel)
 
-def resolve_multi_variant(theme: dict, flavor: dict, accent: dict) -> tuple[dict, str]:
-    fid = flavor["id"]
-    mode = "dark" if "dark" in flavor else "light"
-    base = theme.get(mode, {})
-    flavor_colors = flavor.get(mode, {})
-    accent_colors = accent.get(fid, {})
-    resolved = {**base, **flavor_colors, **accent_colors}
-    return resolved, mode
 
+def generate_single_preview(panel: tuple[str, ...], name: str) -> str:
+    return SINGLE_TEMPLATE.format(panel=render_panel(panel, name, 0))
 
-def generate_all_previews(themes_dir: Path) -> None:
+
+def generate_all_previews(
+    themes_dir: Path,
+    jobs: int = 1,
+    force: bool = False,
+    sprite: bool = True,
+    minify: bool = False,
+) -> None:
     if not themes_dir.exists():
         print("No themes/ directory found")
         return
 
-    theme_dirs = [
+    theme_dirs = sorted(
         d for d in themes_dir.iterdir() if d.is_dir() and (d / "theme.json").exists()
-    ]
+    )
     if not theme_dirs:
         print("No theme folders found")
         return
 
-    for theme_dir in sorted(theme_dirs):
-        theme_file = theme_dir / "theme.json"
-        try:
-            with open(theme_file) as f:
-                theme = json.load(f)
-        except (json.JSONDecodeError, Exception) as e:
-            print(f"Error reading {theme_file}: {e}")
+    generate = partial(generate_theme_previews, force=force, sprite=sprite, minify=minify)
+    if jobs > 1 and len(theme_dirs) > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            results = list(pool.map(generate, theme_dirs))
+    else:
+        results = map(generate, theme_dirs)
+
+    unchanged = 0
+    for messages, up_to_date in results:
+        unchanged += up_to_date
+        for message in messages:
+            print(message)
+    print(f"{unchanged} theme(s) already up to date")
+
+
+def css_ident(value: str) -> str:
+    return re.sub(r"[^A-Za-z0-9_-]", "_", value)
+
+
+def sprite_palettes(
+    theme: dict, configs: list, panels: ConfigPanels
+) -> tuple[dict[str, tuple[str, dict]], str]:
+    # Palette names: "dark"/"light" for plain themes, "<option>--<mode>" for
+    # options, "<flavor>--<accent>" for flavors (ids alone can collide). Each
+    # palette also carries the family it shares most colors with: its flavor.
+    palettes = {}
+    for config in configs:
+        if config.key is None:
             continue
+        family = None
+        if config.flavor is not None:
+            family = css_ident(config.flavor[1]["id"])
+            name = f"{config.flavor[1]['id']}--{config.accent[1]['id']}"
+        elif config.option is not None:
+            name = f"{config.key}--{config.mode}"
+        else:
+            name = config.mode
+        palettes.setdefault(css_ident(name), (family, panels.colors(config)))
+
+    variants = theme.get("variants") or {}
+    if variants.get("type") == "multi":
+        chosen = variants.get("defaults", {}).get("dark", {})
+        default = f"{chosen.get('flavor')}--{chosen.get('accent')}"
+    elif variants.get("options"):
+        default = f"{variants.get('default')}--dark"
+    else:
+        default = "dark"
+    default = css_ident(default)
+    if default not in palettes and palettes:
+        default = next(iter(palettes))
+    return palettes, default
+
+
+def generate_sprite(theme: dict, name: str, configs: list, panels: ConfigPanels) -> str:
+    prefix = css_ident(theme.get("id") or name)
+    palettes, default = sprite_palettes(theme, configs, panels)
+
+    # Colors every accent of a flavor agrees on are set once for the flavor
+    # through an attribute selector; variant rules only carry the rest.
+    families = {}
+    for family, colors in palettes.values():
+        if family is not None:
+            families.setdefault(family, []).append(set(colors.items()))
+    shared = {family: set.intersection(*members) for family, members in families.items()}
+
+    rules = [
+        f'[class*="{prefix}--{family}--"]{{{declarations(dict(common))}}}'
+        for family, common in shared.items()
+        if common
+    ]
+    variant_rules = {}
+    for palette, (family, colors) in palettes.items():
+        own = {key: value for key, value in colors.items() if (key, value) not in shared.get(family, ())}
+        variant_rules.setdefault(declarations(own), []).append(f".{prefix}--{palette}")
+    rules += [f"{','.join(selectors)}{{{body}}}" for body, selectors in variant_rules.items() if body]
+
+    panel = PANEL_TEMPLATE.format(
+        x=0,
+        name=xml_escape(name),
+        font=FONT_STACK,
+        **{key: f"var(--{key})" for key in PANEL_KEYS},
+    )
+    return SPRITE_TEMPLATE.format(
+        default=f"{prefix}--{default}",
+        palettes="\n".join(rules),
+        prefix=prefix,
+        panel=panel,
+    )
 
-        if "dark" not in theme or "light" not in theme:
-            print(f"Skipping {theme_dir.name}: missing dark or light")
-            continue
 
-        theme_name = theme.get("name", theme_dir.name)
-        base_dark, base_light = theme["dark"], theme["light"]
-
-        if "variants" in theme:
-            variants = theme["variants"]
-
-            if variants.get("type") == "multi":
-                defaults = variants.get("defaults", {})
-                dark_defaults = defaults.get("dark", {})
-                light_defaults = defaults.get("light", {})
-                flavors = variants.get("flavors", [])
-                accents = variants.get("accents", [])
-
-                for flavor in flavors:
-                    fid = flavor["id"]
-                    fname = flavor.get("name", fid)
-
-                    for accent in accents:
-                        aid = accent["id"]
-                        aname = accent.get("name", aid)
-                        resolved, mode = resolve_multi_variant(theme, flavor, accent)
-                        label = f"{theme_name} {fname} {aname}"
-
-                        svg = generate_single_preview(resolved, label)
-                        filename = f"preview-{fid}-{aid}.svg"
-                        path = theme_dir / filename
-                        with open(path, "w") as f:
-                            f.write(svg)
-                        print(f"Generated {path}")
-
-                dark_flavor = next(
-                    (f for f in flavors if f["id"] == dark_defaults.get("flavor")), None
-                )
-                dark_accent = next(
-                    (a for a in accents if a["id"] == dark_defaults.get("accent")), None
-                )
-                light_flavor = next(
-                    (f for f in flavors if f["id"] == light_defaults.get("flavor")),
-                    None,
+def declarations(colors: dict) -> str:
+    return ";".join(f"--{key}:{colors[key]}" for key in sorted(colors))
+
+
+def short_hex(match: re.Match) -> str:
+    value = match.group(2).lower()
+    if value[0] == value[1] and value[2] == value[3] and value[4] == value[5]:
+        value = value[::2]
+    return f"{match.group(1)}#{value}"
+
+
+def minify_svg(svg: str) -> str:
+    svg = svg.replace(f' font-family="{FONT_STACK}"', "")
+    svg = re.sub(r"\n\s*", "", svg.strip())
+    # Colors in fill/stroke attributes and in sprite palette declarations.
+    svg = re.sub(r'((?:fill|stroke)="|:)#([0-9a-fA-F]{6})(?=[";}])', short_hex, svg)
+    svg = re.sub(r'="0\.(\d)', r'=".\1', svg)
+    root_end = svg.index(">") + 1
+    return svg[:root_end] + MINIFIED_STYLE + svg[root_end:]
+
+
+def optimize_previews(files: dict[str, str]) -> dict[str, bytes]:
+    """Minified SVGs plus precompressed .svgz (and .svg.br with brotli) siblings."""
+    optimized = {}
+    for filename, svg in files.items():
+        data = minify_svg(svg).encode()
+        optimized[filename] = data
+        # mtime=0 keeps the gzip bytes stable, so unchanged previews stay unchanged.
+        optimized[filename.removesuffix(".svg") + ".svgz"] = gzip.compress(data, 9, mtime=0)
+        if brotli is not None:
+            optimized[filename + ".br"] = brotli.compress(data)
+    return optimized
+
+
+def render_previews(theme: dict, fallback_name: str, sprite: bool = True) -> dict[str, str]:
+    """Every preview SVG of one theme, by filename."""
+    configs = list(theme_model.iter_configs(theme))
+    panels = ConfigPanels()
+    bound = panels.bound
+
+    files = {}
+    if sprite:
+        files["preview-sprite.svg"] = generate_sprite(
+            theme, theme.get("name", fallback_name), configs, panels
+        )
+    theme_name = theme.get("name", fallback_name)
+
+    if "variants" in theme:
+        variants = theme["variants"]
+
+        if variants.get("type") == "multi":
+            # A flavor that declares both modes is invalid; its dark side stands in.
+            flavor_configs = {}
+            for config in configs:
+                if config.key is not None:
+                    flavor_configs.setdefault((config.flavor[0], config.accent[0]), config)
+
+            def default_config(mode):
+                chosen = variants.get("defaults", {}).get(mode, {})
+                for config in flavor_configs.values():
+                    if (config.flavor[1]["id"], config.accent[1]["id"]) == (
+                        chosen.get("flavor"),
+                        chosen.get("accent"),
+                    ):
+                        return config
+                return None
+
+            for config in flavor_configs.values():
+                flavor, accent = config.flavor[1], config.accent[1]
+                fname = flavor.get("name", flavor["id"])
+                aname = accent.get("name", accent["id"])
+                label = f"{theme_name} {fname} {aname}"
+
+                svg = generate_single_preview(bound(config), label)
+                filename = f"preview-{config.key}.svg"
+                files[filename] = svg
+
+            dark_default = default_config("dark")
+            light_default = default_config("light")
+
+            if dark_default:
+                flavor, accent = dark_default.flavor[1], dark_default.accent[1]
+                label = f"{theme_name} {flavor.get('name')} {accent.get('name')} (dark)"
+                svg = generate_single_preview(bound(dark_default), label)
+                for filename in ["preview.svg", "preview-dark.svg"]:
+                    files[filename] = svg
+
+            if light_default:
+                flavor, accent = light_default.flavor[1], light_default.accent[1]
+                label = f"{theme_name} {flavor.get('name')} {accent.get('name')} (light)"
+                svg = generate_single_preview(bound(light_default), label)
+                files["preview-light.svg"] = svg
+        else:
+            default_id = variants.get("default")
+            option_configs = {}
+            for config in configs:
+                option_configs.setdefault(config.option[0], {})[config.mode] = config
+
+            for oi, variant in enumerate(variants.get("options", [])):
+                vid = variant["id"]
+                vname = variant.get("name", vid)
+                dark = bound(option_configs[oi]["dark"])
+                light = bound(option_configs[oi]["light"])
+
+                combined = generate_combined_preview(dark, light, f"{theme_name} {vname}")
+                dark_svg = generate_single_preview(
+                    dark, f"{theme_name} {vname} (dark)"
                 )
-                light_accent = next(
-                    (a for a in accents if a["id"] == light_defaults.get("accent")),
-                    None,
+                light_svg = generate_single_preview(
+                    light, f"{theme_name} {vname} (light)"
                 )
 
-                if dark_flavor and dark_accent:
-                    resolved, _ = resolve_multi_variant(theme, dark_flavor, dark_accent)
-                    label = f"{theme_name} {dark_flavor.get('name')} {dark_accent.get('name')} (dark)"
-                    svg = generate_single_preview(resolved, label)
-                    for filename in ["preview.svg", "preview-dark.svg"]:
-                        path = theme_dir / filename
-                        with open(path, "w") as f:
-                            f.write(svg)
-                        print(f"Generated {path}")
-
-                if light_flavor and light_accent:
-                    resolved, _ = resolve_multi_variant(
-                        theme, light_flavor, light_accent
-                    )
-                    label = f"{theme_name} {light_flavor.get('name')} {light_accent.get('name')} (light)"
-                    svg = generate_single_preview(resolved, label)
-                    path = theme_dir / "preview-light.svg"
-                    with open(path, "w") as f:
-                        f.write(svg)
-                    print(f"Generated {path}")
-            else:
-                default_id = variants.get("default")
-
-                for variant in variants.get("options", []):
-                    vid = variant["id"]
-                    vname = variant.get("name", vid)
-                    dark, light = resolve_variant(base_dark, base_light, variant)
-
-                    resolved = {
-                        "dark": dark,
-                        "light": light,
-                        "name": f"{theme_name} {vname}",
-                    }
-                    combined = generate_combined_preview(resolved)
-                    dark_svg = generate_single_preview(
-                        dark, f"{theme_name} {vname} (dark)"
-                    )
-                    light_svg = generate_single_preview(
-                        light, f"{theme_name} {vname} (light)"
-                    )
-
-                    files = [
-                        (f"preview-{vid}.svg", combined),
-                        (f"preview-{vid}-dark.svg", dark_svg),
-                        (f"preview-{vid}-light.svg", light_svg),
+                option_files = [
+                    (f"preview-{vid}.svg", combined),
+                    (f"preview-{vid}-dark.svg", dark_svg),
+                    (f"preview-{vid}-light.svg", light_svg),
+                ]
+                if vid == default_id:
+                    option_files += [
+                        ("preview.svg", combined),
+                        ("preview-dark.svg", dark_svg),
+                        ("preview-light.svg", light_svg),
                     ]
-                    if vid == default_id:
-                        files += [
-                            ("preview.svg", combined),
-                            ("preview-dark.svg", dark_svg),
-                            ("preview-light.svg", light_svg),
-                        ]
-
-                    for filename, content in files:
-                        path = theme_dir / filename
-                        with open(path, "w") as f:
-                            f.write(content)
-                        print(f"Generated {path}")
-        else:
-            combined = generate_combined_preview(theme)
-            dark = generate_single_preview(base_dark, f"{theme_name} (dark)")
-            light = generate_single_preview(base_light, f"{theme_name} (light)")
 
-            for filename, content in [
-                ("preview.svg", combined),
-                ("preview-dark.svg", dark),
-                ("preview-light.svg", light),
-            ]:
-                path = theme_dir / filename
-                with open(path, "w") as f:
-                    f.write(content)
-                print(f"Generated {path}")
+                for filename, content in option_files:
+                    files[filename] = content
+    else:
+        base = {config.mode: bound(config) for config in configs}
+        combined = generate_combined_preview(
+            base["dark"], base["light"], theme.get("name", "Theme")
+        )
+        dark = generate_single_preview(base["dark"], f"{theme_name} (dark)")
+        light = generate_single_preview(base["light"], f"{theme_name} (light)")
+
+        for filename, content in [
+            ("preview.svg", combined),
+            ("preview-dark.svg", dark),
+            ("preview-light.svg", light),
+        ]:
+            files[filename] = content
+
+    return files
+
+
+def preview_source_hash(theme_bytes: bytes, sprite: bool = True, minify: bool = False) -> str:
+    digest = hashlib.sha256(RENDER_FINGERPRINT)
+    if sprite:
+        digest.update(SPRITE_FINGERPRINT)
+    if minify:
+        digest.update(MINIFIED_STYLE.encode())
+        digest.update(b"brotli" if brotli is not None else b"")
+    digest.update(theme_bytes)
+    return digest.hexdigest()
+
+
+def load_manifest(theme_dir: Path) -> dict:
+    try:
+        with open(theme_dir / MANIFEST_NAME) as f:
+            manifest = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
+    return manifest if isinstance(manifest, dict) else {}
+
+
+def manifest_file_path(theme_dir: Path, filename) -> Optional[Path]:
+    # previews.json comes from the checkout, which in the theme-preview workflow
+    # is an untrusted PR: only a bare preview filename that resolves to a file
+    # directly inside theme_dir is ever read or removed.
+    if not isinstance(filename, str) or not PREVIEW_FILE_RE.fullmatch(filename):
+        return None
+    path = theme_dir / filename
+    if path.resolve().parent != theme_dir.resolve():
+        return None
+    return path
+
+
+def manifest_is_current(theme_dir: Path, manifest: dict, digest: str) -> bool:
+    # Up to date when it was made from this exact theme.json and renderer and
+    # every file it lists is still on disk, byte for byte.
+    files = manifest.get("files")
+    if manifest.get("sourceHash") != digest or not files or not isinstance(files, dict):
+        return False
+    for filename, file_hash in files.items():
+        path = manifest_file_path(theme_dir, filename)
+        if path is None:
+            return False
+        try:
+            data = path.read_bytes()
+        except OSError:
+            return False
+        if hashlib.sha256(data).hexdigest() != file_hash:
+            return False
+    return True
+
+
+def generate_theme_previews(
+    theme_dir: Path, force: bool = False, sprite: bool = True, minify: bool = False
+) -> tuple[list[str], bool]:
+    # Writes the previews of one theme and returns the log lines plus whether it
+    # was already up to date, so themes can be rendered in worker processes and
+    # still log in directory order.
+    messages = []
+    theme_file = theme_dir / "theme.json"
+    try:
+        theme_bytes = theme_file.read_bytes()
+        theme = json.loads(theme_bytes)
+    except (json.JSONDecodeError, Exception) as e:
+        messages.append(f"Error reading {theme_file}: {e}")
+        return messages, False
+
+    if "dark" not in theme or "light" not in theme:
+        messages.append(f"Skipping {theme_dir.name}: missing dark or light")
+        return messages, False
+
+    digest = preview_source_hash(theme_bytes, sprite, minify)
+    # --force trusts nothing the manifest says, including which files to remove.
+    manifest = {} if force else load_manifest(theme_dir)
+    if not force and manifest_is_current(theme_dir, manifest, digest):
+        return messages, True
+
+    # Only files whose bytes differ are written, so an unchanged preview never
+    # shows up in a diff; previews the theme no longer has are removed.
+    file_hashes = {}
+    files = render_previews(theme, theme_dir.name, sprite)
+    if minify:
+        files = optimize_previews(files)
+    for filename, content in files.items():
+        data = content if isinstance(content, bytes) else content.encode()
+        file_hashes[filename] = hashlib.sha256(data).hexdigest()
+        path = theme_dir / filename
+        try:
+            if path.read_bytes() == data:
+                continue
+        except OSError:
+            pass
+        path.write_bytes(data)
+        messages.append(f"Generated {path}")
+
+    # Under --force the manifest isn't consulted, so every preview-named file in
+    # the directory that wasn't just rendered counts as stale.
+    if force:
+        stale_files = [path.name for path in theme_dir.iterdir()]
+    else:
+        stale_files = manifest.get("files")
+        stale_files = stale_files if isinstance(stale_files, dict) else ()
+    for filename in stale_files:
+        if filename in file_hashes:
+            continue
+        path = manifest_file_path(theme_dir, filename)
+        if path is not None and path.exists():
+            path.unlink()
+            messages.append(f"Removed {path}")
+
+    manifest_text = json.dumps(
+        {"sourceHash": digest, "files": file_hashes}, indent=2, sort_keys=True
+    ) + "\n"
+    manifest_path = theme_dir / MANIFEST_NAME
+    try:
+        if manifest_path.read_text() == manifest_text:
+            return messages, False
+    except OSError:
+        pass
+    manifest_path.write_text(manifest_text)
+    return messages, False
 
 
 def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="render themes in this many processes (0 = one per CPU)",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="re-render every theme, even when its manifest is current",
+    )
+    parser.add_argument(
+        "--sprite",
+        action=argparse.BooleanOptionalAction,
+        default=True,
+        help="also write preview-sprite.svg: one shared panel plus a CSS palette per variant",
+    )
+    parser.add_argument(
+        "--minify",
+        action="store_true",
+        help="write minified SVGs with .svgz (and, with brotli installed, .svg.br) siblings",
+    )
+    args = parser.parse_args()
+
     themes_dir = Path(__file__).parent.parent / "themes"
-    generate_all_previews(themes_dir)
+    generate_all_previews(
+        themes_dir, args.jobs or os.cpu_count(), args.force, args.sprite, args.minify
+    )
     print("\nDone!")
 
 
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""Harvest upvotes and moderator status of every plugin tracking issue into ranking.json.
+
+Upvotes are the 👍 reactions on each plugin's tracking issue (see ensure_issues.py). All
+plugin issues are pulled through the GraphQL API a hundred per request, so a full harvest
+costs a handful of requests rather than one per issue. The raw harvest is cached, and a
+cache younger than ``--max-age`` seconds is reused instead of hitting the API again.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+import ensure_issues
+
+ISSUES_QUERY = """
+query PluginIssues($owner: String!, $name: String!, $label: String!, $after: String) {
+  repository(owner: $owner, name: $name) {
+    issues(first: 100, after: $after, labels: [$label], states: [OPEN, CLOSED],
+           orderBy: {field: CREATED_AT, direction: ASC}) {
+      pageInfo { hasNextPage endCursor }
+      nodes {
+        number
+        state
+        body
+        labels(first: 20) { nodes { name } }
+        reactionGroups { content viewerHasReacted reactors { totalCount } }
+      }
+    }
+  }
+}
+"""
+
+# Labels the moderator webhook applies for /broken, /unmaintained, /deprecated and /review.
+STATUS_LABELS = ["broken", "deprecated", "reviewed", "unmaintained"]
+DEFAULT_MAX_AGE_SECONDS = 3600
+# Generated site data lives with the site's static files, not at the repository root
+RANKING_PATH = Path(__file__).parent.parent / "site" / "dms" / "static" / "ranking.json"
+
+
+def default_cache_path() -> Path:
+    cache_home = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(cache_home) / "dms-plugin-registry" / "plugin-issues.json"
+
+
+def graphql(query: str, variables: dict) -> dict:
+    response = ensure_issues.api("POST", "/graphql", json={"query": query, "variables": variables})
+    payload = response.json()
+    if payload.get("errors"):
+        messages = "; ".join(error.get("message", "unknown error") for error in payload["errors"])
+        raise RuntimeError(f"GraphQL query failed: {messages}")
+    return payload["data"]
+
+
+def fetch_issue_nodes() -> list[dict]:
+    owner, name = ensure_issues.GITHUB_REPOSITORY.split("/", 1)
+    variables = {"owner": owner, "name": name, "label": ensure_issues.PLUGIN_LABEL, "after": None}
+    nodes = []
+    while True:
+        issues = graphql(ISSUES_QUERY, variables)["repository"]["issues"]
+        nodes.extend(issues["nodes"])
+        if not issues["pageInfo"]["hasNextPage"]:
+            return nodes
+        variables["after"] = issues["pageInfo"]["endCursor"]
+
+
+def summarize_issue(node: dict) -> tuple[str, dict] | None:
+    match = ensure_issues.MARKER_RE.search(node.get("body") or "")
+    if not match:
+        return None
+
+    # ensure_issues.py seeds every new issue with the token holder's own 👍, which
+    # shows up as viewerHasReacted and is not a real vote.
+    upvotes = 0
+    for group in node.get("reactionGroups") or []:
+        if group["content"] != "THUMBS_UP":
+            continue
+        upvotes = group["reactors"]["totalCount"] - (1 if group.get("viewerHasReacted") else 0)
+
+    labels = {label["name"] for label in (node.get("labels") or {}).get("nodes", [])}
+    return match.group(1), {
+        "issue": node["number"],
+        "open": node["state"] == "OPEN",
+        "upvotes": max(upvotes, 0),
+        "status": [label for label in STATUS_LABELS if label in labels],
+    }
+
+
+def harvest() -> dict[str, dict]:
+    issues = {}
+    for node in fetch_issue_nodes():
+        summary = summarize_issue(node)
+        if summary is None:
+            continue
+        plugin_id, entry = summary
+        # Oldest issue wins, like ensure_issues.py, unless only a newer one is open.
+        current = issues.get(plugin_id)
+        if current is None or (entry["open"] and not current["open"]):
+            issues[plugin_id] = entry
+    return issues
+
+
+def load_cache(cache_path: Path, max_age: float) -> dict[str, dict] | None:
+    try:
+        with open(cache_path) as f:
+            cache = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+
+    if cache.get("repository") != ensure_issues.GITHUB_REPOSITORY:
+        return None
+    if time.time() - cache.get("fetchedAt", 0) > max_age:
+        return None
+    return cache.get("issues")
+
+
+def save_cache(cache_path: Path, issues: dict[str, dict]) -> None:
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(cache_path, "w") as f:
+        json.dump(
+            {"repository": ensure_issues.GITHUB_REPOSITORY, "fetchedAt": time.time(), "issues": issues},
+            f,
+        )
+
+
+def build_ranking(issues: dict[str, dict], plugin_ids: set[str]) -> dict[str, dict]:
+    """Rank registry plugins by upvotes; ties keep a stable id order."""
+    ranked = sorted(
+        (plugin_id for plugin_id in plugin_ids if plugin_id in issues),
+        key=lambda plugin_id: (-issues[plugin_id]["upvotes"], plugin_id.lower()),
+    )
+
+    ranking = {}
+    for position, plugin_id in enumerate(ranked, start=1):
+        issue = issues[plugin_id]
+        entry = {"rank": position, "upvotes": issue["upvotes"], "issue": issue["issue"]}
+        if issue["status"]:
+            entry["status"] = issue["status"]
+        ranking[plugin_id] = entry
+    return ranking
+
+
+def main() -> int:
+    repo_root = Path(__file__).parent.parent
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--output", type=Path, default=RANKING_PATH)
+    parser.add_argument("--cache", type=Path, default=default_cache_path())
+    parser.add_argument(
+        "--max-age",
+        type=float,
+        default=DEFAULT_MAX_AGE_SECONDS,
+        help="reuse a cached harvest younger than this many seconds",
+    )
+    parser.add_argument("--refresh", action="store_true", help="ignore the cache")
+    args = parser.parse_args()
+
+    issues = None if args.refresh else load_cache(args.cache, args.max_age)
+    if issues is None:
+        if not ensure_issues.GITHUB_TOKEN:
+            print("GITHUB_TOKEN is required", file=sys.stderr)
+            return 1
+        issues = harvest()
+        save_cache(args.cache, issues)
+        print(f"Harvested {len(issues)} plugin issues")
+    else:
+        print(f"Using cached harvest from {args.cache}")
+
+    plugins = ensure_issues.load_plugins(repo_root / "plugins")
+    ranking = build_ranking(issues, set(plugins))
+
+    with open(args.output, "w") as f:
+        json.dump(ranking, f, sort_keys=True, separators=(",", ":"))
+        f.write("\n")
+    print(f"Wrote {args.output} ({len(ranking)} plugins)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,21 +1,18 @@
 #!/usr/bin/env python3
 """Generate nix/plugins-prefetch.json from plugins/*.json"""
 
+import argparse
 import json
+import os
 import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from pathlib import Path
 
 root = Path.cwd()
 plugins_dir = root / "plugins"
 output_path = root / "nix/plugins-prefetch.json"
 
-result = {}
-
-existing = {}
-if output_path.is_file():
-    with output_path.open() as f:
-        existing = json.load(f)
-
 
 def run_prefetch(repo):
     cmd = [
@@ -26,37 +23,46 @@ def run_prefetch(repo):
         "nix-prefetch-git",
         repo,
     ]
+    # stderr is nix-prefetch-git's progress; it is captured so concurrent
+    # prefetches don't interleave and is printed with the plugin's log.
     run = subprocess.run(
         cmd,
         check=True,
         text=True,
         stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
     )
-    return run.stdout
+    return run.stdout, run.stderr
 
 
-for plugin_file in plugins_dir.iterdir():
-    if not plugin_file.is_file():
-        continue
+def prefetch_plugin(plugin_file, existing):
+    """Prefetch one plugin.
 
+    Returns (plugin_id, prefetch data or None, log lines, error). The error is the
+    CalledProcessError to re-raise when the prefetch failed with no existing data
+    to fall back on.
+    """
     with plugin_file.open() as f:
         meta = json.load(f)
 
     plugin_id = meta["id"]
     repo = meta["repo"]
-
-    print(f"fetching plugin {plugin_id} from {repo}")
+    log = [f"fetching plugin {plugin_id} from {repo}"]
 
     # Run nix-prefetch-git, reusing last-known-good data on transient failures
     try:
-        prefetch = json.loads(run_prefetch(repo))
-    except subprocess.CalledProcessError:
+        stdout, stderr = run_prefetch(repo)
+    except subprocess.CalledProcessError as e:
+        if e.stderr:
+            log.append(e.stderr.rstrip())
         if plugin_id not in existing:
-            print(f"  ERROR: prefetch failed for {plugin_id} and no existing data to reuse")
-            raise
-        print(f"  WARNING: prefetch failed for {plugin_id}, reusing existing data")
-        result[plugin_id] = existing[plugin_id]
-        continue
+            log.append(f"  ERROR: prefetch failed for {plugin_id} and no existing data to reuse")
+            return plugin_id, None, log, e
+        log.append(f"  WARNING: prefetch failed for {plugin_id}, reusing existing data")
+        return plugin_id, existing[plugin_id], log, None
+    if stderr:
+        log.append(stderr.rstrip())
+    prefetch = json.loads(stdout)
 
     # Locate plugin.json
     base_path = Path(prefetch["path"])
@@ -73,9 +79,48 @@ for plugin_file in plugins_dir.iterdir():
         if "version" in plugin_info:
             prefetch["meta"]["version"] = plugin_info["version"]
 
-    result[plugin_id] = prefetch
+    return plugin_id, prefetch, log, None
+
 
-with output_path.open("w") as f:
-    json.dump(
-        result, f, sort_keys=True, indent=2  # prevent order changes to reduce diffs
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="prefetches to run in parallel (0 = number of CPUs)",
     )
+    args = parser.parse_args()
+
+    existing = {}
+    if output_path.is_file():
+        with output_path.open() as f:
+            existing = json.load(f)
+
+    plugin_files = sorted(p for p in plugins_dir.iterdir() if p.is_file())
+
+    # Each prefetch blocks on a full clone, so they overlap on a bounded pool.
+    # map() yields in plugin order, so each plugin's log prints as one block and
+    # the run reads the same whatever order the clones finish in.
+    result = {}
+    errors = []
+    prefetch = partial(prefetch_plugin, existing=existing)
+    with ThreadPoolExecutor(max_workers=args.jobs or os.cpu_count()) as pool:
+        for plugin_id, data, log, error in pool.map(prefetch, plugin_files):
+            print("\n".join(log), flush=True)
+            if error is not None:
+                errors.append(error)
+            else:
+                result[plugin_id] = data
+
+    if errors:
+        raise errors[0]
+
+    with output_path.open("w") as f:
+        json.dump(
+            result, f, sort_keys=True, indent=2  # prevent order changes to reduce diffs
+        )
+
+
+if __name__ == "__main__":
+    main()
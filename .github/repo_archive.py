@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""One archive download per plugin repository, shared by the registry scripts.
+
+validate_links.py and generate_site_content.py each need a few files from every
+plugin repository: plugin.json, README.md, the default branch and whether the
+plugin's path exists. Fetched one by one that is four or five requests per plugin.
+Here a single ``git ls-remote --symref`` resolves the default branch and its commit,
+and the archive of that commit is streamed once: every plugin.json and README.md in
+it is kept, along with the list of paths, and everything else is discarded
+unread. Snapshots are cached on disk by commit, so a repository that hasn't moved
+costs only the ls-remote, and monorepo plugins share their repository's snapshot.
+"""
+
+import json
+import os
+import posixpath
+import subprocess
+import sys
+import tarfile
+import tempfile
+import threading
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Optional
+from urllib.parse import urlparse
+
+import requests
+
+ARCHIVE_CACHE_DIR = Path(__file__).parent.parent / ".cache" / "archives"
+SNAPSHOT_FILES = frozenset({"plugin.json", "README.md"})
+# Archives are streamed; these only bound what one bad repository can cost.
+MAX_ARCHIVE_BYTES = 64 * 1024 * 1024
+MAX_MEMBER_BYTES = 1024 * 1024
+
+
+def parse_repo_url(repo_url: str) -> Optional[tuple[str, str, str]]:
+    """(host, owner, repo) of a repository URL, or None if it has no owner/repo."""
+    parsed = urlparse(repo_url)
+    repo_path = parsed.path.strip("/")
+    if repo_path.endswith(".git"):
+        repo_path = repo_path[:-4]
+    path_parts = repo_path.split("/")
+    if not parsed.netloc or len(path_parts) < 2 or not all(path_parts[:2]):
+        return None
+    return parsed.netloc, path_parts[0], path_parts[1]
+
+
+def remote_head(repo_url: str) -> Optional[tuple[str, str]]:
+    """(default branch, commit SHA) of a repository from one ``git ls-remote``."""
+    try:
+        result = subprocess.run(
+            ["git", "ls-remote", "--symref", repo_url, "HEAD"],
+            capture_output=True,
+            text=True,
+            timeout=15,
+            env={**os.environ, "GIT_TERMINAL_PROMPT": "0"},
+        )
+    except (OSError, subprocess.TimeoutExpired) as e:
+        print(f"Warning: Failed to look up HEAD of {repo_url}: {e}", file=sys.stderr)
+        return None
+    if result.returncode != 0:
+        return None
+
+    # ref: refs/heads/main<TAB>HEAD
+    # <sha><TAB>HEAD
+    branch = sha = None
+    for line in result.stdout.splitlines():
+        target, _, ref = line.partition("\t")
+        if ref != "HEAD":
+            continue
+        if target.startswith("ref: refs/heads/"):
+            branch = target.removeprefix("ref: refs/heads/")
+        else:
+            sha = target
+    if branch is None or sha is None:
+        return None
+    return branch, sha
+
+
+def archive_url(host: str, owner: str, repo: str, sha: str) -> Optional[str]:
+    if host == "github.com":
+        # codeload serves archives without counting against the API rate limit
+        return f"https://codeload.github.com/{owner}/{repo}/tar.gz/{sha}"
+    if host == "gitlab.com" or "gitlab" in host:
+        return f"https://{host}/{owner}/{repo}/-/archive/{sha}/{repo}-{sha}.tar.gz"
+    if host == "codeberg.org" or "gitea" in host or "forgejo" in host:
+        return f"https://{host}/{owner}/{repo}/archive/{sha}.tar.gz"
+    return None
+
+
+class RepoSnapshot:
+    """The files the registry scripts read from one commit of a repository."""
+
+    def __init__(self, branch: str, sha: str, files: dict[str, str], paths: list[str]):
+        self.branch = branch
+        self.sha = sha
+        self.files = files
+        self.paths = frozenset(paths)
+
+    def read(self, path: str) -> Optional[str]:
+        """Content of a kept file (plugin.json or README.md), or None if absent."""
+        return self.files.get(posixpath.normpath(path.strip("/")))
+
+    def exists(self, path: str) -> bool:
+        """Whether a file or directory exists at ``path`` in the commit."""
+        return posixpath.normpath(path.strip("/")) in self.paths
+
+
+def download_snapshot(url: str) -> Optional[tuple[dict[str, str], list[str]]]:
+    """Stream an archive, keeping SNAPSHOT_FILES and the list of paths."""
+    files = {}
+    paths = set()
+    with requests.get(url, stream=True, timeout=30) as response:
+        if response.status_code != 200:
+            return None
+        if int(response.headers.get("Content-Length") or 0) > MAX_ARCHIVE_BYTES:
+            return None
+        response.raw.decode_content = True
+        with tarfile.open(fileobj=response.raw, mode="r|*") as archive:
+            read = 0
+            for member in archive:
+                read += member.size
+                if read > MAX_ARCHIVE_BYTES:
+                    return None
+                # Members sit under a single <repo>-<sha>/ directory
+                _, _, path = member.name.partition("/")
+                if not path:
+                    continue
+                path = path.rstrip("/")
+                paths.add(path)
+                parent = path.rpartition("/")[0]
+                while parent and parent not in paths:
+                    paths.add(parent)
+                    parent = parent.rpartition("/")[0]
+                if (
+                    member.isfile()
+                    and path.rpartition("/")[2] in SNAPSHOT_FILES
+                    and member.size <= MAX_MEMBER_BYTES
+                ):
+                    data = archive.extractfile(member).read()
+                    files[path] = data.decode("utf-8", errors="replace")
+    return files, sorted(paths)
+
+
+class ArchiveFetcher:
+    """Snapshots by repository, fetched at most once per run and cached by commit.
+
+    Safe to share between threads: concurrent requests for one repository wait for
+    the same download.
+    """
+
+    def __init__(self, cache_dir: Optional[Path] = ARCHIVE_CACHE_DIR):
+        self.cache_dir = cache_dir
+        self.downloads = 0
+        self._lock = threading.Lock()
+        self._snapshots: dict[tuple[str, str, str], Future] = {}
+
+    def snapshot(self, repo_url: str) -> Optional[RepoSnapshot]:
+        """Snapshot of the repository's default branch, or None if unavailable.
+
+        None means callers should fall back to fetching files individually.
+        """
+        repo = parse_repo_url(repo_url)
+        if repo is None or archive_url(*repo, "HEAD") is None:
+            return None
+
+        with self._lock:
+            future = self._snapshots.get(repo)
+            fetching = future is None
+            if fetching:
+                future = self._snapshots[repo] = Future()
+        if fetching:
+            try:
+                future.set_result(self._load(repo_url, repo))
+            except Exception as e:
+                print(f"Warning: Failed to fetch archive of {repo_url}: {e}", file=sys.stderr)
+                future.set_result(None)
+        return future.result()
+
+    def _cache_path(self, repo: tuple[str, str, str], sha: str) -> Path:
+        host, owner, name = repo
+        return self.cache_dir / host / owner / f"{name}@{sha}.json"
+
+    def _load(self, repo_url: str, repo: tuple[str, str, str]) -> Optional[RepoSnapshot]:
+        head = remote_head(repo_url)
+        if head is None:
+            return None
+        branch, sha = head
+
+        if self.cache_dir:
+            try:
+                with open(self._cache_path(repo, sha)) as f:
+                    cached = json.load(f)
+                return RepoSnapshot(branch, sha, cached["files"], cached["paths"])
+            except (OSError, json.JSONDecodeError, KeyError):
+                pass
+
+        downloaded = download_snapshot(archive_url(*repo, sha))
+        with self._lock:
+            self.downloads += 1
+        if downloaded is None:
+            return None
+        files, paths = downloaded
+        if self.cache_dir:
+            self._store(repo, sha, {"files": files, "paths": paths})
+        return RepoSnapshot(branch, sha, files, paths)
+
+    def _store(self, repo: tuple[str, str, str], sha: str, snapshot: dict) -> None:
+        path = self._cache_path(repo, sha)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Write then rename, so a concurrent reader never sees a partial snapshot
+        with tempfile.NamedTemporaryFile("w", dir=path.parent, delete=False) as f:
+            json.dump(snapshot, f)
+        os.replace(f.name, path)
+        # Earlier commits of the repository are never read again
+        for stale in path.parent.glob(f"{repo[2]}@*.json"):
+            if stale != path:
+                stale.unlink(missing_ok=True)
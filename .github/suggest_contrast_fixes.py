@@ -0,0 +1,358 @@
+#!/usr/bin/env python3
+"""Suggest the smallest color changes that bring failing theme pairs up to WCAG contrast.
+
+For every pair check_wcag.py scores below the target, the foreground key is re-solved in
+OKLCH: hue and chroma stay fixed and only perceptual lightness moves, to the nearest value
+that meets the target against every key it is paired with in TEXT_PAIRS/NON_TEXT_PAIRS.
+Suggestions are made against the theme.json layer that actually defines the color (base
+mode, variant option, flavor or accent), so constraints from every config sharing that
+layer are honored at once. Output is a JSON Patch (RFC 6902) per theme with --json.
+"""
+
+import argparse
+import json
+import math
+from pathlib import Path
+
+import check_wcag
+import theme_model
+
+GREEN = "\033[92m"
+RED = "\033[91m"
+YELLOW = "\033[93m"
+RESET = "\033[0m"
+
+TARGET_RATIOS = {"AA": check_wcag.AA_RATIO, "AAA": check_wcag.AAA_RATIO}
+
+# Coarse lightness step for the outward scan; each hit is then bisected down to
+# below one 8-bit step, so the suggestion is the first hex value that passes.
+SCAN_STEP = 0.01
+BISECT_STEPS = 16
+GAMUT_STEPS = 12
+GAMUT_EPSILON = 1e-6
+
+
+# OKLab/OKLCH: https://bottosson.github.io/posts/oklab/
+def srgb_to_linear(channel):
+    if channel <= 0.04045:
+        return channel / 12.92
+    return ((channel + 0.055) / 1.055) ** 2.4
+
+
+def linear_to_srgb(channel):
+    if channel <= 0.0031308:
+        return channel * 12.92
+    return 1.055 * channel ** (1 / 2.4) - 0.055
+
+
+def hex_to_oklch(value):
+    r, g, b = (srgb_to_linear(c / 255) for c in check_wcag.parse_hex(value))
+    l = math.cbrt(0.4122214708 * r + 0.5363325363 * g + 0.0514459929 * b)
+    m = math.cbrt(0.2119034982 * r + 0.6806995451 * g + 0.1073969566 * b)
+    s = math.cbrt(0.0883024619 * r + 0.2817188376 * g + 0.6299787005 * b)
+
+    lightness = 0.2104542553 * l + 0.7936177850 * m - 0.0040720468 * s
+    a = 1.9779984951 * l - 2.4285922050 * m + 0.4505937099 * s
+    b = 0.0259040371 * l + 0.7827717662 * m - 0.8086757660 * s
+    return lightness, math.hypot(a, b), math.atan2(b, a)
+
+
+def oklch_to_linear(lightness, chroma, hue):
+    a = chroma * math.cos(hue)
+    b = chroma * math.sin(hue)
+    l = (lightness + 0.3963377774 * a + 0.2158037573 * b) ** 3
+    m = (lightness - 0.1055613458 * a - 0.0638541728 * b) ** 3
+    s = (lightness - 0.0894841775 * a - 1.2914855480 * b) ** 3
+    return (
+        4.0767416621 * l - 3.3077115913 * m + 0.2309699292 * s,
+        -1.2684380046 * l + 2.6097574011 * m - 0.3413193965 * s,
+        -0.0041960863 * l - 0.7034186147 * m + 1.7076147010 * s,
+    )
+
+
+def in_gamut(rgb):
+    return all(-GAMUT_EPSILON <= c <= 1 + GAMUT_EPSILON for c in rgb)
+
+
+def oklch_to_hex(lightness, chroma, hue):
+    # Keep the chroma when sRGB can show it; otherwise give up only as much of
+    # it as needed, so the hue still holds.
+    rgb = oklch_to_linear(lightness, chroma, hue)
+    if not in_gamut(rgb):
+        low, high = 0.0, chroma
+        for _ in range(GAMUT_STEPS):
+            mid = (low + high) / 2
+            if in_gamut(oklch_to_linear(lightness, mid, hue)):
+                low = mid
+            else:
+                high = mid
+        rgb = oklch_to_linear(lightness, low, hue)
+
+    channels = (round(min(max(linear_to_srgb(max(c, 0.0)), 0.0), 1.0) * 255) for c in rgb)
+    return "#{:02x}{:02x}{:02x}".format(*channels)
+
+
+def min_ratio(value, constraints):
+    luminance = check_wcag.hex_luminance(value)
+    return min(check_wcag.luminance_ratio(luminance, partner) / needed for partner, needed in constraints)
+
+
+_SOLVED = {}
+
+
+def solve(value, constraints):
+    """Nearest hex to ``value`` along OKLCH lightness meeting every (luminance, ratio).
+
+    Returns None when no lightness works, e.g. when the key sits between a very dark
+    and a very light partner.
+    """
+    key = (value.lower(), constraints)
+    if key in _SOLVED:
+        return _SOLVED[key]
+
+    def passes(candidate):
+        return min_ratio(candidate, constraints) >= 1
+
+    lightness, chroma, hue = hex_to_oklch(value)
+    best = None
+    for direction in (1, -1):
+        previous = lightness
+        found = None
+        step = 1
+        while found is None:
+            target = min(max(lightness + direction * step * SCAN_STEP, 0.0), 1.0)
+            if passes(oklch_to_hex(target, chroma, hue)):
+                found = target
+            elif target in (0.0, 1.0):
+                break
+            else:
+                previous = target
+                step += 1
+        if found is None:
+            continue
+
+        low, high = previous, found
+        for _ in range(BISECT_STEPS):
+            mid = (low + high) / 2
+            if passes(oklch_to_hex(mid, chroma, hue)):
+                high = mid
+            else:
+                low = mid
+
+        candidate = oklch_to_hex(high, chroma, hue)
+        distance = abs(high - lightness)
+        if best is None or distance < best[1]:
+            best = (candidate, distance)
+
+    result = best[0] if best else None
+    _SOLVED[key] = result
+    return result
+
+
+def pair_targets(target):
+    text_ratio = TARGET_RATIOS[target]
+    targets = {}
+    for pair in check_wcag.TEXT_PAIRS:
+        targets[pair] = text_ratio
+    for pair in check_wcag.NON_TEXT_PAIRS:
+        targets[pair] = check_wcag.NON_TEXT_RATIO
+    return targets
+
+
+def failing_patches(theme, targets):
+    # A failing pair is fixed through its foreground key, at the layer that
+    # defines that key for the failing config. The new color then has to hold up
+    # in every config inheriting that layer, against every partner of the key,
+    # not just the pair that failed.
+    patches = {}
+    for mode in ("dark", "light"):
+        configs = theme_model.mode_configs(theme, mode)
+        for config in configs:
+            for (fg_key, bg_key), ratio in check_wcag.scheme_ratios(config.colors).items():
+                # A foreground DMS derives through a fallback has no layer of its
+                # own to patch.
+                if ratio >= targets[(fg_key, bg_key)] or config.source(fg_key) is None:
+                    continue
+                patch = patches.setdefault(
+                    (mode, config.source(fg_key), fg_key),
+                    {"value": config.colors[fg_key], "failing": [], "configs": set(), "constraints": set()},
+                )
+                patch["failing"].append((config.key, fg_key, bg_key, ratio))
+
+        for (patch_mode, path, color_key), patch in patches.items():
+            if patch_mode != mode:
+                continue
+            for config in configs:
+                if config.source(color_key) != path:
+                    continue
+                patch["configs"].add(config.key)
+                # Keys derived from color_key move with it, so their partners
+                # constrain it too; a pair that moves on both sides can't.
+                moving = moving_keys(config, color_key)
+                for (fg_key, bg_key), needed in targets.items():
+                    if (fg_key in moving) == (bg_key in moving):
+                        continue
+                    partner = check_wcag.hex_luminance(config.colors.get(bg_key if fg_key in moving else fg_key))
+                    if partner is not None:
+                        patch["constraints"].add((partner, needed))
+    return patches
+
+
+def moving_keys(config, color_key):
+    """``color_key`` plus every key ``config`` derives from it through a fallback."""
+    keys = {color_key}
+    for key, chain in theme_model.FALLBACK_CHAINS.items():
+        if config.source(key) is not None:
+            continue
+        source = next((candidate for candidate in chain[1:] if config.source(candidate) is not None), None)
+        if source == color_key:
+            keys.add(key)
+    return keys
+
+
+def set_pointer(document, pointer, value):
+    tokens = [token.replace("~1", "/").replace("~0", "~") for token in pointer.split("/")[1:]]
+    target = document
+    for token in tokens[:-1]:
+        target = target[int(token)] if isinstance(target, list) else target[token]
+    target[tokens[-1]] = value
+
+
+def theme_suggestions(theme, target="AA"):
+    # Fixes are applied one at a time and the theme re-scored, so a later fix
+    # sees earlier ones: lightening primaryText can be what makes primary
+    # solvable. A key is patched at most once, so two keys that keep breaking
+    # each other can't oscillate; the loop is also capped at the number of
+    # keys there are to patch.
+    targets = pair_targets(target)
+    working = json.loads(json.dumps(theme))
+    changed = {}
+    patchable = {
+        (mode, pointer, key)
+        for mode in ("dark", "light")
+        for config in theme_model.mode_configs(working, mode)
+        for pointer, layer in config.layers
+        for key in layer
+    }
+
+    for _ in range(len(patchable)):
+        patches = failing_patches(working, targets)
+        for patch_id, patch in patches.items():
+            if patch_id in changed:
+                continue
+            value = patch["value"]
+            if not check_wcag.parse_hex(value):
+                continue
+            fixed = solve(value, tuple(sorted(patch["constraints"])))
+            if fixed is None:
+                continue
+            mode, path, color_key = patch_id
+            set_pointer(working, f"{path}/{theme_model.pointer_escape(color_key)}", fixed)
+            worst = min(patch["failing"], key=lambda failing: failing[3])
+            changed.setdefault(patch_id, {"previous": value, "worst": worst})
+            break
+        else:
+            break
+
+    suggestions = []
+    final = failing_patches(working, targets)
+    unsolved = [(patch_id, patch) for patch_id, patch in final.items() if patch_id not in changed]
+    for patch_id, patch in list(changed.items()) + unsolved:
+        mode, path, color_key = patch_id
+        resolved = theme_model.mode_configs(working, mode)
+        configs = sorted({config.key for config in resolved if config.source(color_key) == path})
+        if patch_id in changed:
+            value = patch_value(working, path, color_key)
+            worst = patch["worst"]
+            previous = patch["previous"]
+        else:
+            value = None
+            worst = min(patch["failing"], key=lambda failing: failing[3])
+            previous = patch["value"]
+
+        suggestion = {
+            "op": "replace",
+            "path": f"{path}/{theme_model.pointer_escape(color_key)}",
+            "value": value,
+            "previous": previous,
+            "mode": mode,
+            "key": color_key,
+            "configs": configs,
+            "worstPair": [worst[1], worst[2]],
+            "worstRatio": round(worst[3], 2),
+        }
+        if value is not None:
+            suggestion["minRatio"] = round(key_min_ratio(resolved, path, color_key, targets), 2)
+        suggestions.append(suggestion)
+
+    return suggestions
+
+
+def patch_value(theme, path, color_key):
+    target = theme
+    for token in path.split("/")[1:]:
+        token = token.replace("~1", "/").replace("~0", "~")
+        target = target[int(token)] if isinstance(target, list) else target[token]
+    return target[color_key]
+
+
+def key_min_ratio(configs, path, color_key, targets):
+    ratios = []
+    for config in configs:
+        if config.source(color_key) != path:
+            continue
+        moving = moving_keys(config, color_key)
+        ratios.extend(
+            ratio
+            for (fg_key, bg_key), ratio in check_wcag.scheme_ratios(config.colors, targets).items()
+            if (fg_key in moving) != (bg_key in moving)
+        )
+    return min(ratios)
+
+
+def print_suggestions(results):
+    for slug, suggestions in sorted(results.items()):
+        if not suggestions:
+            print(f"{slug}: {GREEN}nothing to fix{RESET}")
+            continue
+        print(f"{slug}:")
+        for s in suggestions:
+            scope = f"{len(s['configs'])} config(s)" if s["configs"] != [""] else s["mode"]
+            pair = f"{s['worstPair'][0]} on {s['worstPair'][1]} {s['worstRatio']}:1"
+            if s["value"] is None:
+                print(f"  {RED}{s['path']}{RESET} {s['previous']} — no lightness works ({pair}, {scope})")
+                continue
+            print(
+                f"  {YELLOW}{s['path']}{RESET} {s['previous']} → {s['value']} "
+                f"(was {pair}; now ≥ {s['minRatio']}:1 across {scope})"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("dirs", nargs="*", help="theme directories (default: all)")
+    parser.add_argument("--target", choices=sorted(TARGET_RATIOS), default="AA")
+    parser.add_argument("--json", action="store_true", help="print JSON Patch operations per theme")
+    args = parser.parse_args()
+
+    if args.dirs:
+        theme_dirs = [Path(d) for d in args.dirs]
+    else:
+        themes_root = Path(__file__).parent.parent / "themes"
+        theme_dirs = sorted(d for d in themes_root.iterdir() if (d / "theme.json").exists())
+
+    results = {}
+    for theme_dir in theme_dirs:
+        theme = check_wcag.load_theme(theme_dir)
+        if theme is None:
+            continue
+        results[theme_dir.name] = theme_suggestions(theme, args.target)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print_suggestions(results)
+
+
+if __name__ == "__main__":
+    main()
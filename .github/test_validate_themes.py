@@ -0,0 +1,36 @@
+"""Tests for validate_themes.py: python3 -m pytest .github"""
+
+import json
+from pathlib import Path
+
+import validate_themes
+
+THEMES_DIR = Path(__file__).parent.parent / "themes"
+
+
+def write_theme(themes_dir: Path, dirname: str, **fields) -> None:
+    theme = json.loads((THEMES_DIR / "amoled-black-theme" / "theme.json").read_text())
+    theme.update(fields)
+    (themes_dir / dirname).mkdir(parents=True)
+    (themes_dir / dirname / "theme.json").write_text(json.dumps(theme))
+
+
+def test_unhashable_id_and_name_are_reported(tmp_path, capsys):
+    write_theme(tmp_path, "first", name=["x"], id={"a": 1})
+    write_theme(tmp_path, "second", name=["x"], id=["y"])
+
+    assert validate_themes.validate_all_themes(tmp_path) is False
+    output = capsys.readouterr().out
+    assert "name must be a non-empty string" in output
+    assert "must be camelCase" in output
+    assert "Duplicate" not in output
+
+
+def test_duplicate_id_and_name_are_reported(tmp_path, capsys):
+    write_theme(tmp_path, "first", name="Same", id="sameTheme")
+    write_theme(tmp_path, "second", name="Same", id="sameTheme")
+
+    assert validate_themes.validate_all_themes(tmp_path) is False
+    output = capsys.readouterr().out
+    assert "Duplicate ID 'sameTheme' (also in first)" in output
+    assert "Duplicate name 'Same' (also in first)" in output
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""What a theme.json "config" is, shared by the theme scripts.
+
+A config is one color scheme a user can actually select: a mode of a plain theme, a
+variant option in one mode, or a flavor/accent combination in the flavor's mode. Its
+scheme is the stack of theme.json layers it inherits (base mode, then option or flavor,
+then accent), resolved through a ChainMap view over the original dicts instead of a
+merged copy per config.
+"""
+
+from collections import ChainMap
+from functools import cached_property
+
+MODES = ("dark", "light")
+
+# Fallbacks match DankMaterialShell Common/Theme.qml, which derives missing
+# container steps from the ones a theme does define.
+FALLBACKS = {
+    "surfaceContainer": "surface",
+    "surfaceContainerHigh": "surfaceContainer",
+    "surfaceContainerHighest": "surfaceContainerHigh",
+    "surfaceVariantText": "surfaceText",
+    "background": "surface",
+    "secondary": "primary",
+    "info": "primary",
+    "warning": "error",
+}
+
+
+def _layer(value):
+    # Malformed layers are reported by validate_themes.py; everywhere else they
+    # simply contribute no colors.
+    return value if isinstance(value, dict) else {}
+
+
+def pointer_escape(token):
+    # JSON Pointer (RFC 6901) reference token
+    return token.replace("~", "~0").replace("/", "~1")
+
+
+class LayeredScheme(ChainMap):
+    """ChainMap whose lookups walk the layers once.
+
+    ChainMap.get checks membership across every layer and then looks the key up
+    again; scoring does tens of thousands of lookups per run.
+    """
+
+    def __getitem__(self, key):
+        for layer in self.maps:
+            if key in layer:
+                return layer[key]
+        return self.__missing__(key)
+
+    def get(self, key, default=None):
+        for layer in self.maps:
+            if key in layer:
+                return layer[key]
+        return default
+
+
+def fallback_chain(key):
+    chain = [key]
+    while chain[-1] in FALLBACKS:
+        chain.append(FALLBACKS[chain[-1]])
+    return tuple(chain)
+
+
+FALLBACK_CHAINS = {key: fallback_chain(key) for key in sorted(FALLBACKS)}
+_FALLBACK_PLANS = {}
+
+
+def fallback_plan(present):
+    """(key, source) for every missing key a fallback fills, given the defined keys.
+
+    Configs of a theme nearly always define the same keys, so plans are cached by
+    key set and each fallback walk runs once per distinct set.
+    """
+    try:
+        return _FALLBACK_PLANS[present]
+    except KeyError:
+        pass
+
+    plan = []
+    for key, chain in FALLBACK_CHAINS.items():
+        if key in present:
+            continue
+        source = next((candidate for candidate in chain[1:] if candidate in present), None)
+        if source is not None:
+            plan.append((key, source))
+    plan = _FALLBACK_PLANS[present] = tuple(plan)
+    return plan
+
+
+def resolve_fallbacks(scheme):
+    """``scheme`` with every key DMS would derive from a fallback filled in."""
+    maps = scheme.maps if isinstance(scheme, ChainMap) else [scheme]
+    plan = fallback_plan(frozenset().union(*maps))
+    if not plan:
+        return scheme
+    derived = {key: scheme[source] for key, source in plan}
+    return LayeredScheme(*maps, derived)
+
+
+class ThemeConfig:
+    """One selectable config.
+
+    ``layers`` is a tuple of ``(json_pointer, dict)`` from the base mode up; ``option``,
+    ``flavor`` and ``accent`` are ``(index, dict)`` of the variant entries it came from,
+    or None.
+    """
+
+    def __init__(self, mode, key, layers, option=None, flavor=None, accent=None):
+        self.mode = mode
+        self.key = key
+        self.layers = layers
+        self.option = option
+        self.flavor = flavor
+        self.accent = accent
+
+    @cached_property
+    def scheme(self):
+        return LayeredScheme(*[layer for _, layer in reversed(self.layers)])
+
+    @cached_property
+    def colors(self):
+        """The scheme as DMS draws it: ``scheme`` plus the fallbacks it implies."""
+        return resolve_fallbacks(self.scheme)
+
+    @property
+    def group(self):
+        # What the config rolls up to in reports: the option, or the flavor for
+        # flavor/accent combinations.
+        if self.flavor is not None:
+            return self.flavor[1].get("id")
+        return self.key
+
+    def source(self, color_key):
+        """JSON Pointer of the layer that supplies ``color_key``, or None."""
+        for pointer, layer in reversed(self.layers):
+            if color_key in layer:
+                return pointer
+        return None
+
+
+def iter_configs(theme, modes=MODES):
+    """Yield the configs of ``theme`` in the given modes.
+
+    Option themes go option by option, flavor themes flavor by flavor then accent by
+    accent, so each variant's configs come out together. Keys are None where the
+    variant entry has no id; callers that need a key skip those.
+    """
+    variants = theme.get("variants")
+    bases = {mode: (f"/{mode}", _layer(theme.get(mode))) for mode in modes}
+
+    if variants and variants.get("type") == "multi":
+        accents = variants.get("accents", [])
+        for fi, flavor in enumerate(variants.get("flavors", [])):
+            fid = flavor.get("id")
+            for mode in modes:
+                if mode not in flavor:
+                    continue
+                flavor_layer = (f"/variants/flavors/{fi}/{mode}", _layer(flavor.get(mode)))
+                for ai, accent in enumerate(accents):
+                    aid = accent.get("id")
+                    accent_layer = (
+                        f"/variants/accents/{ai}/{pointer_escape(fid) if isinstance(fid, str) else fi}",
+                        _layer(accent.get(fid) if isinstance(fid, str) else None),
+                    )
+                    yield ThemeConfig(
+                        mode,
+                        f"{fid}-{aid}" if fid and aid else None,
+                        (bases[mode], flavor_layer, accent_layer),
+                        flavor=(fi, flavor),
+                        accent=(ai, accent),
+                    )
+        return
+
+    options = (variants or {}).get("options", [])
+    if not options:
+        for mode in modes:
+            yield ThemeConfig(mode, "", (bases[mode],))
+        return
+
+    for oi, option in enumerate(options):
+        for mode in modes:
+            yield ThemeConfig(
+                mode,
+                option.get("id") or None,
+                (bases[mode], (f"/variants/options/{oi}/{mode}", _layer(option.get(mode)))),
+                option=(oi, option),
+            )
+
+
+def mode_configs(theme, mode):
+    """Configs of one mode that have a key, in iter_configs order."""
+    return [config for config in iter_configs(theme, (mode,)) if config.key is not None]
+
+
+def default_key(theme, mode):
+    """Key of the config a user gets on first apply in ``mode``."""
+    variants = theme.get("variants")
+    if not variants:
+        return ""
+    if variants.get("type") == "multi":
+        defaults = variants.get("defaults", {}).get(mode, {})
+        return f"{defaults.get('flavor')}-{defaults.get('accent')}"
+    if not variants.get("options"):
+        return ""
+    return variants.get("default", "")
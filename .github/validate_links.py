@@ -20,6 +20,8 @@ from urllib.parse import urlparse
 
 import requests
 
+from repo_archive import ArchiveFetcher, RepoSnapshot
+
 # GitHub token for authenticated API requests (avoids rate limiting)
 GITHUB_TOKEN = os.environ.get("GITHUB_TOKEN")
 
@@ -109,14 +111,24 @@ def validate_url(url: str, timeout: int = 10) -> tuple[bool, str]:
         return False, str(e)
 
 
-def validate_repo_path(repo_url: str, path: str) -> tuple[bool, str]:
+def validate_repo_path(
+    repo_url: str, path: str, snapshot: RepoSnapshot | None = None
+) -> tuple[bool, str]:
     """
     Validate that a path exists in a git repository.
     Supports GitHub, GitLab, Codeberg, and other common git hosting services.
 
+    Args:
+        snapshot: The repository's archive snapshot, answered locally when given
+
     Returns:
         (is_valid, error_message)
     """
+    if snapshot is not None:
+        if snapshot.exists(path):
+            return True, ""
+        return False, f"Path '{path}' not found in repository"
+
     parsed = urlparse(repo_url)
 
     # Extract owner/repo from path like /owner/repo or /owner/repo.git
@@ -174,17 +186,30 @@ def validate_repo_path(repo_url: str, path: str) -> tuple[bool, str]:
         return False, f"Failed to check path: {str(e)}"
 
 
-def fetch_plugin_json(repo_url: str, path: str = "") -> tuple[dict | None, str]:
+def fetch_plugin_json(
+    repo_url: str, path: str = "", snapshot: RepoSnapshot | None = None
+) -> tuple[dict | None, str]:
     """
     Fetch the plugin.json file from a git repository.
 
     Args:
         repo_url: The repository URL
         path: Optional path for monorepo plugins (if specified, fetches from {repo}/{path}/plugin.json)
+        snapshot: The repository's archive snapshot, read locally when given
 
     Returns:
         (plugin_data, error_message) - plugin_data is None if failed
     """
+    if snapshot is not None:
+        plugin_json_path = f"{path}/plugin.json" if path else "plugin.json"
+        content = snapshot.read(plugin_json_path)
+        if content is None:
+            return None, f"plugin.json not found at {plugin_json_path}"
+        try:
+            return json.loads(content), ""
+        except json.JSONDecodeError as e:
+            return None, f"Invalid JSON in plugin.json: {e}"
+
     parsed = urlparse(repo_url)
 
     # Extract owner/repo from path like /owner/repo or /owner/repo.git
@@ -247,10 +272,13 @@ def fetch_plugin_json(repo_url: str, path: str = "") -> tuple[dict | None, str]:
         return None, f"Failed to fetch plugin.json: {str(e)}"
 
 
-def validate_plugin(plugin_file: Path) -> list[str]:
+def validate_plugin(plugin_file: Path, archives: ArchiveFetcher | None = None) -> list[str]:
     """
     Validate a single plugin file.
 
+    Repository checks read the repository's archive snapshot from ``archives``
+    when one can be fetched, and fall back to individual requests otherwise.
+
     Returns:
         List of error messages (empty if valid)
     """
@@ -296,14 +324,19 @@ def validate_plugin(plugin_file: Path) -> list[str]:
         if not repo_url:
             errors.append("Repository URL is empty")
         else:
-            is_valid, error_msg = validate_url(repo_url)
+            snapshot = archives.snapshot(repo_url) if archives else None
+            if snapshot is not None:
+                # Resolving HEAD and downloading the archive reached the repository
+                is_valid, error_msg = True, ""
+            else:
+                is_valid, error_msg = validate_url(repo_url)
             if not is_valid:
                 errors.append(f"Repository URL unreachable: {error_msg}")
             else:
                 # Validate path if present
                 if "path" in plugin and plugin["path"]:
                     path = plugin["path"]
-                    is_valid, error_msg = validate_repo_path(repo_url, path)
+                    is_valid, error_msg = validate_repo_path(repo_url, path, snapshot)
                     if not is_valid:
                         errors.append(f"Path validation failed: {error_msg}")
                     elif error_msg:  # Warning message (unsupported service)
@@ -312,7 +345,8 @@ def validate_plugin(plugin_file: Path) -> list[str]:
                 # Validate plugin name and id match repository plugin.json
                 repo_plugin_data, error_msg = fetch_plugin_json(
                     repo_url,
-                    plugin.get("path", "")
+                    plugin.get("path", ""),
+                    snapshot,
                 )
                 if repo_plugin_data is None:
                     errors.append(f"Failed to fetch repository plugin.json: {error_msg}")
@@ -382,10 +416,11 @@ def main():
     print(f"Validating {len(plugin_files)} plugin(s)...\n")
 
     all_errors = {}
+    archives = ArchiveFetcher()
 
     for plugin_file in sorted(plugin_files):
         print(f"Checking {plugin_file.name}...", end=" ")
-        errors = validate_plugin(plugin_file)
+        errors = validate_plugin(plugin_file, archives)
 
         if errors:
             print(f"{RED}FAILED{RESET}")
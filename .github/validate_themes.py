@@ -1,11 +1,17 @@
 #!/usr/bin/env python3
 """Validate theme JSON files in the themes/ directory."""
 
+import argparse
 import json
+import os
 import re
 import sys
+from collections.abc import Mapping
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
+import theme_model
+
 GREEN = "\033[92m"
 RED = "\033[91m"
 YELLOW = "\033[93m"
@@ -64,7 +70,7 @@ def validate_color_scheme(
     errors = []
     fields = required_fields if required_fields is not None else REQUIRED_COLOR_FIELDS
 
-    if not isinstance(scheme, dict):
+    if not isinstance(scheme, Mapping):
         return [f"{scheme_name} must be an object"]
 
     for field in fields:
@@ -100,6 +106,10 @@ def validate_variants(theme: dict) -> list[str]:
     if not default_id:
         errors.append("variants.default is required")
 
+    option_configs = {}
+    for config in theme_model.iter_configs(theme):
+        option_configs.setdefault(config.option[0], []).append(config)
+
     variant_ids = []
     for i, variant in enumerate(options):
         vid = variant.get("id")
@@ -115,12 +125,15 @@ def validate_variants(theme: dict) -> list[str]:
         if not vname:
             errors.append(f"variants.options[{i}] missing required field: name")
 
-        for mode in ["dark", "light"]:
-            base = theme.get(mode, {})
+        for config in option_configs.get(i, []):
+            mode = config.mode
             override = variant.get(mode, {})
-            resolved = {**base, **override}
+            if not isinstance(override, dict):
+                errors.append(f"variants.options[{i}].{mode} must be an object")
+                continue
+
             label = f"variants.options[{i}] ({vid or i}) resolved {mode}"
-            errors.extend(validate_color_scheme(resolved, label))
+            errors.extend(validate_color_scheme(config.scheme, label))
 
             for key, value in override.items():
                 if not is_valid_hex_color(value):
@@ -167,7 +180,6 @@ def validate_multi_variants(theme: dict) -> list[str]:
         errors.append("variants.defaults.light.accent is required")
 
     flavor_ids = []
-    flavor_modes = {}
     for i, flavor in enumerate(flavors):
         fid = flavor.get("id")
         fname = flavor.get("name")
@@ -193,9 +205,6 @@ def validate_multi_variants(theme: dict) -> list[str]:
                 f"variants.flavors[{i}] ({fid or i}) should have only 'dark' or 'light', not both"
             )
 
-        if fid:
-            flavor_modes[fid] = "dark" if has_dark else "light"
-
     dark_flavor_ids = [f["id"] for f in flavors if "dark" in f]
     light_flavor_ids = [f["id"] for f in flavors if "light" in f]
 
@@ -241,37 +250,106 @@ def validate_multi_variants(theme: dict) -> list[str]:
             f"variants.defaults.light.accent '{light_defaults['accent']}' not found in accents"
         )
 
-    for fi, flavor in enumerate(flavors):
-        fid = flavor.get("id")
-        if not fid:
-            continue
-        mode = flavor_modes.get(fid)
-        if not mode:
-            continue
-        flavor_colors = flavor.get(mode, {})
-
-        for ai, accent in enumerate(accents):
-            aid = accent.get("id")
-            if not aid:
+    # Each layer's colors are checked once where they are written, and required
+    # fields are checked per flavor/accent combination by set algebra on the
+    # layers' keys, rather than validating a resolved copy of every combination.
+    # A flavor that declares both modes was reported above; its dark side stands in.
+    combos = {}
+    for config in theme_model.iter_configs(theme):
+        if config.key is not None:
+            combos.setdefault((config.flavor[0], config.accent[0]), config)
+
+    checked_layers = set()
+    for config in combos.values():
+        for pointer, layer in config.layers:
+            if pointer in checked_layers:
                 continue
-            accent_colors = accent.get(fid, {})
-            resolved = {**theme.get(mode, {}), **flavor_colors, **accent_colors}
-            label = f"resolved {fid}+{aid}"
-            errors.extend(validate_color_scheme(resolved, label))
+            checked_layers.add(pointer)
+            errors.extend(validate_layer_colors(theme, pointer, layer))
+
+    required = frozenset(REQUIRED_COLOR_FIELDS)
+    missing_by_flavor = {}
+    for (fi, ai), config in combos.items():
+        present = frozenset().union(*(layer.keys() for _, layer in config.layers))
+        missing_by_flavor.setdefault(fi, []).append((config, required - present))
+
+    for fi, combo_missing in missing_by_flavor.items():
+        fid = flavors[fi]["id"]
+        # Missing from every accent: the flavor (or its base mode) is where it belongs.
+        everywhere = frozenset.intersection(*(missing for _, missing in combo_missing))
+        for field in REQUIRED_COLOR_FIELDS:
+            if field in everywhere:
+                errors.append(
+                    f"variants.flavors[{fi}] ({fid}) missing required field: {field} "
+                    f"(not set by its base mode or any accent)"
+                )
+        for config, missing in combo_missing:
+            aid = config.accent[1]["id"]
+            for field in REQUIRED_COLOR_FIELDS:
+                if field in missing and field not in everywhere:
+                    errors.append(f"resolved {fid}+{aid} missing required field: {field}")
 
     return errors
 
 
-def validate_theme(theme_file: Path) -> list[str]:
+def validate_layer_colors(theme: dict, pointer: str, layer: dict) -> list[str]:
+    # Only the color fields are checked: layers may carry other settings, such
+    # as matugen_type on a flavor.
     errors = []
+    raw = theme
+    for token in pointer.split("/")[1:]:
+        token = token.replace("~1", "/").replace("~0", "~")
+        raw = raw[int(token)] if isinstance(raw, list) else (raw or {}).get(token)
+    label = layer_label(pointer)
+    if raw is not None and not isinstance(raw, dict):
+        return [f"{label} must be an object"]
+
+    for field in REQUIRED_COLOR_FIELDS:
+        if field not in layer:
+            continue
+        value = layer[field]
+        if not isinstance(value, str):
+            errors.append(f"{label}.{field} must be a string")
+        elif not is_valid_hex_color(value):
+            errors.append(f"{label}.{field} must be a valid hex color (got: {value})")
+    return errors
+
 
+def layer_label(pointer: str) -> str:
+    # "/variants/accents/2/mocha" -> "variants.accents[2].mocha"
+    label = ""
+    for token in pointer.split("/")[1:]:
+        token = token.replace("~1", "/").replace("~0", "~")
+        label += f"[{token}]" if token.isdigit() else f".{token}"
+    return label.lstrip(".")
+
+
+def validate_theme(theme_file: Path) -> list[str]:
     try:
-        with open(theme_file, "r") as f:
-            theme = json.load(f)
-    except json.JSONDecodeError as e:
-        return [f"Invalid JSON: {e}"]
+        source = theme_file.read_bytes()
     except Exception as e:
         return [f"Failed to read file: {e}"]
+    return check_theme_source(source)[0]
+
+
+def check_theme_source(source: bytes) -> tuple[list[str], str | None, str | None]:
+    """Parse and validate one theme.json, returning its errors, id and name.
+
+    Everything here depends only on the file's own bytes, so results can be cached by
+    content and computed in worker processes; duplicate detection stays in the caller.
+    """
+    try:
+        theme = json.loads(source)
+    except (json.JSONDecodeError, UnicodeDecodeError) as e:
+        return [f"Invalid JSON: {e}"], None, None
+    if not isinstance(theme, dict):
+        return ["Theme must be a JSON object"], None, None
+
+    return validate_theme_data(theme), theme.get("id"), theme.get("name")
+
+
+def validate_theme_data(theme: dict) -> list[str]:
+    errors = []
 
     for field in REQUIRED_META_FIELDS:
         if field not in theme:
@@ -281,7 +359,7 @@ def validate_theme(theme_file: Path) -> list[str]:
         theme_id = theme["id"]
         if not theme_id:
             errors.append("ID is empty")
-        elif not is_camel_case(theme_id):
+        elif not isinstance(theme_id, str) or not is_camel_case(theme_id):
             errors.append(
                 f"ID '{theme_id}' must be camelCase (start lowercase, alphanumeric only)"
             )
@@ -319,53 +397,80 @@ def validate_theme(theme_file: Path) -> list[str]:
     return errors
 
 
-def validate_all_themes(themes_dir: Path) -> bool:
+def check_theme_sources(
+    sources: list[bytes], jobs: int = 1, cache: dict | None = None
+) -> list[tuple[list[str], str | None, str | None]]:
+    # Identical files, e.g. a theme nobody touched between a PR's base and head,
+    # are validated once.
+    cache = {} if cache is None else cache
+    pending = list(dict.fromkeys(source for source in sources if source not in cache))
+    if jobs > 1 and len(pending) > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            results = list(pool.map(check_theme_source, pending))
+    else:
+        results = map(check_theme_source, pending)
+    cache.update(zip(pending, results))
+
+    checked = []
+    for source in sources:
+        errors, theme_id, theme_name = cache[source]
+        checked.append((list(errors), theme_id, theme_name))
+    return checked
+
+
+def validate_all_themes(
+    themes_dir: Path, jobs: int = 1, cache: dict | None = None
+) -> bool:
     if not themes_dir.exists():
         print(f"{YELLOW}No themes/ directory found, skipping theme validation{RESET}")
         return True
 
-    theme_dirs = [
+    theme_dirs = sorted(
         d for d in themes_dir.iterdir() if d.is_dir() and (d / "theme.json").exists()
-    ]
+    )
     if not theme_dirs:
         print(f"{YELLOW}No theme folders found in themes/{RESET}")
         return True
 
     print(f"Validating {len(theme_dirs)} theme(s)...\n")
 
+    sources = []
+    read_errors = {}
+    for theme_dir in theme_dirs:
+        try:
+            sources.append((theme_dir / "theme.json").read_bytes())
+        except Exception as e:
+            sources.append(b"")
+            read_errors[theme_dir] = f"Failed to read file: {e}"
+    results = check_theme_sources(sources, jobs, cache)
+    for i, theme_dir in enumerate(theme_dirs):
+        if theme_dir in read_errors:
+            results[i] = ([read_errors[theme_dir]], None, None)
+
     all_errors = {}
     seen_ids = {}
     seen_names = {}
 
-    for theme_dir in sorted(theme_dirs):
-        theme_file = theme_dir / "theme.json"
+    for theme_dir, (errors, theme_id, theme_name) in zip(theme_dirs, results):
         print(f"Checking {theme_dir.name}/theme.json...", end=" ")
-        errors = validate_theme(theme_file)
 
-        try:
-            with open(theme_file) as f:
-                theme = json.load(f)
-
-            theme_id = theme.get("id")
-            if theme_id:
-                if theme_id in seen_ids:
-                    errors.append(
-                        f"Duplicate ID '{theme_id}' (also in {seen_ids[theme_id]})"
-                    )
-                else:
-                    seen_ids[theme_id] = theme_dir.name
-
-            theme_name = theme.get("name")
-            if theme_name:
-                if theme_name in seen_names:
-                    errors.append(
-                        f"Duplicate name '{theme_name}' (also in {seen_names[theme_name]})"
-                    )
-                else:
-                    seen_names[theme_name] = theme_dir.name
+        # Only well-formed values take part; a list or dict id/name was already
+        # reported above and can't be a dictionary key anyway.
+        if theme_id and isinstance(theme_id, str):
+            if theme_id in seen_ids:
+                errors.append(
+                    f"Duplicate ID '{theme_id}' (also in {seen_ids[theme_id]})"
+                )
+            else:
+                seen_ids[theme_id] = theme_dir.name
 
-        except (json.JSONDecodeError, Exception):
-            pass
+        if theme_name and isinstance(theme_name, str):
+            if theme_name in seen_names:
+                errors.append(
+                    f"Duplicate name '{theme_name}' (also in {seen_names[theme_name]})"
+                )
+            else:
+                seen_names[theme_name] = theme_dir.name
 
         if errors:
             print(f"{RED}FAILED{RESET}")
@@ -388,8 +493,33 @@ def validate_all_themes(themes_dir: Path) -> bool:
 
 
 def main():
-    themes_dir = Path(__file__).parent.parent / "themes"
-    success = validate_all_themes(themes_dir)
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "themes_dirs",
+        nargs="*",
+        type=Path,
+        help="themes/ trees to validate, e.g. a PR's base and head checkouts "
+        "(default: this repository's)",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="validate themes in this many processes (0 = one per CPU)",
+    )
+    args = parser.parse_args()
+
+    themes_dirs = args.themes_dirs or [Path(__file__).parent.parent / "themes"]
+    jobs = args.jobs or os.cpu_count()
+
+    cache = {}
+    success = True
+    for themes_dir in themes_dirs:
+        if len(themes_dirs) > 1:
+            print(f"=== {themes_dir} ===")
+        success = validate_all_themes(themes_dir, jobs, cache) and success
+        if len(themes_dirs) > 1:
+            print()
     sys.exit(0 if success else 1)
 
 
@@ -1,5 +1,79 @@
 import Fuse from "https://cdnjs.cloudflare.com/ajax/libs/fuse.js/7.0.0/fuse.basic.min.mjs";
-(async () => {
+
+// Prebuilt inverted index (.github/build_search_index.py): index.json holds the
+// documents and the prefix table, and each shard holds the sorted terms sharing a
+// prefix with their postings as flat [doc, score, ...] arrays. Only the shards
+// for the words being typed are downloaded, once each.
+const SEARCH_INDEX_URL = './static/search/';
+const shardCache = new Map();
+
+// Same folding as the index builder: lowercase, accents stripped, word runs
+const tokenize = (text) =>
+    text.toLowerCase().normalize('NFKD').replace(/\p{M}/gu, '').match(/[\p{L}\p{N}_]+/gu) || [];
+
+const loadShard = (filename) => {
+    if (!shardCache.has(filename)) {
+        shardCache.set(filename, fetch(SEARCH_INDEX_URL + filename).then((response) => response.json()));
+    }
+    return shardCache.get(filename);
+};
+
+// Every query word must prefix-match a term of the document; a document's score
+// is the sum over words of its best matching term, exact matches counting double.
+const searchIndex = async (index, query) => {
+    const words = tokenize(query).filter((word) => word.length >= index.prefixLength);
+    if (words.length === 0) {
+        return [];
+    }
+
+    let scores = null;
+    for (const word of words) {
+        const wordScores = new Map();
+        const filename = index.shards[word.slice(0, index.prefixLength)];
+        if (filename) {
+            const shard = await loadShard(filename);
+            let low = 0;
+            let high = shard.terms.length;
+            while (low < high) {
+                const mid = (low + high) >> 1;
+                if (shard.terms[mid] < word) {
+                    low = mid + 1;
+                } else {
+                    high = mid;
+                }
+            }
+            for (let i = low; i < shard.terms.length && shard.terms[i].startsWith(word); i++) {
+                const weight = shard.terms[i] === word ? 2 : 1;
+                const postings = shard.postings[i];
+                for (let j = 0; j < postings.length; j += 2) {
+                    const score = postings[j + 1] * weight;
+                    if (score > (wordScores.get(postings[j]) || 0)) {
+                        wordScores.set(postings[j], score);
+                    }
+                }
+            }
+        }
+
+        if (scores === null) {
+            scores = wordScores;
+        } else {
+            for (const [doc, score] of scores) {
+                if (wordScores.has(doc)) {
+                    scores.set(doc, score + wordScores.get(doc));
+                } else {
+                    scores.delete(doc);
+                }
+            }
+        }
+    }
+
+    return [...scores]
+        .sort((a, b) => b[1] - a[1] || a[0] - b[0])
+        .map(([doc]) => ({ slug: index.docs[doc][0], title: index.docs[doc][1] }));
+};
+
+// Fallback when the prebuilt index is missing: marmite's full search_index.json
+const loadFuseSearch = async () => {
     const fuseOptions = {
         threshold: 0.25,
         findAllMatches: true,
@@ -9,11 +83,30 @@ import Fuse from "https://cdnjs.cloudflare.com/ajax/libs/fuse.js/7.0.0/fuse.basi
         keys: ["title", "description", "tags", "html"]
     };
 
+    const response = await fetch('./static/search_index.json');
+    const data = await response.json();
+    const fuse = new Fuse(data, fuseOptions);
+    return async (query) => fuse.search(query).map((result) => result.item);
+};
+
+const loadSearch = async () => {
     try {
-        const response = await fetch('./static/search_index.json');
-        const data = await response.json();
-        const fuse = new Fuse(data, fuseOptions);
-        document.getElementById("marmite-search-input").addEventListener("input", (event) => {
+        const response = await fetch(SEARCH_INDEX_URL + 'index.json');
+        if (response.ok) {
+            const index = await response.json();
+            return (query) => searchIndex(index, query);
+        }
+    } catch (error) {
+        console.warn('Prebuilt search index unavailable, falling back to Fuse:', error);
+    }
+    return loadFuseSearch();
+};
+
+(async () => {
+    try {
+        const search = await loadSearch();
+        let latestPattern = "";
+        document.getElementById("marmite-search-input").addEventListener("input", async (event) => {
             event.preventDefault();
 
             // Clear previous results
@@ -25,15 +118,21 @@ import Fuse from "https://cdnjs.cloudflare.com/ajax/libs/fuse.js/7.0.0/fuse.basi
 
             // Search for results
             const searchPattern = event.target.value;
+            latestPattern = searchPattern;
             if (searchPattern?.length > 2) {
-                const results = fuse.search(searchPattern);
+                const results = await search(searchPattern);
+                // A shard may still have been loading while the user kept typing
+                if (searchPattern !== latestPattern) {
+                    return;
+                }
+                resultsElement.innerHTML = "";
                 if(results?.length > 0) {
                     // Build the results list, limiting here to 10 items
-                    results.slice(0, 10).forEach((result) => {
+                    results.slice(0, 10).forEach((item) => {
                         const elementList = document.createElement("li");
                         const resultElement = document.createElement("a");
-                        resultElement.href = `${result.item.slug}.html`;
-                        resultElement.innerText = result.item.title;
+                        resultElement.href = `${item.slug}.html`;
+                        resultElement.innerText = item.title;
                         elementList.appendChild(resultElement);
                         resultsElement.appendChild(elementList);
                     });